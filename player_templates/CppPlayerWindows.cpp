@@ -5,6 +5,7 @@
 #else
 #include <sys/socket.h>
 #include <arpa/inet.h>
+#include <netinet/tcp.h>
 #include <unistd.h>
 #endif
 
@@ -77,6 +78,9 @@ public:
       return false;
     }
 
+    int noDelay = 1;
+    setsockopt(sock, IPPROTO_TCP, TCP_NODELAY, (const char*)&noDelay, sizeof(noDelay));
+
     cout << "Connected to game server on port " << port << endl;
     return true;
   }
@@ -89,6 +93,9 @@ public:
       try {
         json gameState = json::parse(gameStateStr);
         json move = makeMove(gameState);
+        if (gameState.contains("version")) {
+          move["ack"] = gameState["version"];  // Which state this move answers
+        }
 
         string moveStr = move.dump();
         sendMessage(moveStr + "\n");
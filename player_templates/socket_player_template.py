@@ -1,24 +1,187 @@
 import socket
 import json
 import sys
+import os
 import math
 import random
 import time
+import struct
+from multiprocessing import shared_memory, resource_tracker
+
+CELL_SIZE = 60  # Board geometry of the server, used to place troops
+MARGIN = 10
+
+class DeltaDecoder:
+    """Rebuilds the plain game state dict from the server's "delta" messages."""
+    def __init__(self):
+        self.states = {}  # version -> (static map info, base tuples, {movement id: record})
+    
+    def decode(self, message):
+        if message["base"] is None:
+            static = {
+                "size": message["size"],
+                "game_max_duration": message["game_max_duration"],
+                "map": message["map"],
+            }
+            bases, movements = [None] * len(static["map"]), {}
+        else:
+            static, bases, movements = self.states[message["base"]]
+            bases, movements = list(bases), dict(movements)
+        
+        for index, owner, units, growth_rate in message["bases"]:
+            bases[index] = (owner, units, growth_rate)
+        for record in message["movements"]:
+            movements[record[0]] = record
+        for movement_id in message["removed"]:
+            movements.pop(movement_id, None)
+        
+        # The server never goes back to a version older than the one it used
+        base_version = message["base"] or 0
+        self.states = {v: state for v, state in self.states.items() if v >= base_version}
+        self.states[message["version"]] = (static, bases, movements)
+        
+        game_time = message["game_time"]
+        return {
+            "player": message["player"],
+            "version": message["version"],
+            "size": static["size"],
+            "bases": [{"x": x, "y": y, "owner": owner, "units": units, "growth_rate": growth_rate, "type": base_type}
+                      for (x, y, base_type), (owner, units, growth_rate) in zip(static["map"], bases)],
+            "movements": [self.movement_state(record, game_time) for record in movements.values()],
+            "game_time": game_time,
+            "game_max_duration": static["game_max_duration"],
+        }
+    
+    @staticmethod
+    def movement_state(record, game_time):
+        """Position a movement along its path the same way the server does."""
+        _, source_x, source_y, units, owner, start_time, duration, path = record
+        progress = min((game_time - start_time) / duration, 1.0)
+        waypoints = [(x * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2,
+                      y * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2) for x, y in path]
+        segments = len(waypoints) - 1
+        if segments == 0:
+            current_x, current_y = waypoints[-1]
+        else:
+            segment_index = int(progress * segments)
+            segment_progress = (progress * segments) % 1.0
+            if segment_index >= segments:
+                segment_index = segments - 1
+                segment_progress = 1.0
+            (start_x, start_y), (end_x, end_y) = waypoints[segment_index], waypoints[segment_index + 1]
+            current_x = start_x + (end_x - start_x) * segment_progress
+            current_y = start_y + (end_y - start_y) * segment_progress
+        return {
+            "source_x": source_x,
+            "source_y": source_y,
+            "units": units,
+            "owner": owner,
+            "current_x": current_x / (CELL_SIZE + MARGIN),
+            "current_y": current_y / (CELL_SIZE + MARGIN),
+            "progress": progress,
+        }
+
+class BinaryDecoder:
+    """Decodes the server's "binary" frames into the plain game state dict.
+    
+    Bots that want raw numbers can iterate BASE_RECORD / MOVEMENT_RECORD
+    over the payload themselves instead of building dicts.
+    """
+    HEADER = struct.Struct("<BIHddHH")  # player, version, size, game_time, game_max_duration, base count, movement count
+    BASE_RECORD = struct.Struct("<HHbdBB")  # x, y, owner, units, growth_rate, type code
+    MOVEMENT_RECORD = struct.Struct("<HHbdddd")  # source_x, source_y, owner, units, current_x, current_y, progress
+    reads_frames = True  # States arrive as length-prefixed frames on the socket
+    
+    def __init__(self, base_types):
+        self.base_types = base_types  # Type names indexed by type code, from the welcome
+    
+    def decode(self, payload):
+        player, version, size, game_time, max_duration, base_count, movement_count = self.HEADER.unpack_from(payload)
+        bases_start = self.HEADER.size
+        movements_start = bases_start + base_count * self.BASE_RECORD.size
+        with memoryview(payload) as view:
+            bases = [{"x": x, "y": y, "owner": owner, "units": int(units) if units.is_integer() else units,
+                      "growth_rate": growth_rate, "type": self.base_types[type_code]}
+                     for x, y, owner, units, growth_rate, type_code
+                     in self.BASE_RECORD.iter_unpack(view[bases_start:movements_start])]
+            movements = [{"source_x": source_x, "source_y": source_y, "units": int(units) if units.is_integer() else units,
+                          "owner": owner, "current_x": current_x, "current_y": current_y, "progress": progress}
+                         for source_x, source_y, owner, units, current_x, current_y, progress
+                         in self.MOVEMENT_RECORD.iter_unpack(view[movements_start:])]
+        return {
+            "player": player,
+            "version": version,
+            "size": size,
+            "bases": bases,
+            "movements": movements,
+            "game_time": game_time,
+            "game_max_duration": int(max_duration) if max_duration.is_integer() else max_duration,
+        }
+
+class SharedMemoryDecoder(BinaryDecoder):
+    """Reads states the server publishes in shared memory ("shm" protocol).
+    
+    The segment starts with a sequence number that is odd while the server
+    writes; a read is only kept if the number was even and unchanged around it.
+    """
+    SEQUENCE = struct.Struct("<Q")
+    LENGTH = struct.Struct("<I")
+    PAYLOAD_START = SEQUENCE.size + LENGTH.size
+    reads_frames = False  # The socket only carries JSON notices
+    
+    def __init__(self, base_types, name):
+        super().__init__(base_types)
+        self.segment = None
+        self.attach(name)
+    
+    def attach(self, name):
+        if self.segment:
+            self.segment.close()
+        self.segment = shared_memory.SharedMemory(name=name)
+        # The server owns the segment and removes it; don't let our exit unlink it.
+        # The tracker knows it by its POSIX name, which is the public name with a leading slash
+        resource_tracker.unregister("/" + self.segment.name, "shared_memory")
+    
+    def read(self, notice):
+        if "shm_name" in notice:
+            self.attach(notice["shm_name"])
+        buffer = self.segment.buf
+        while True:
+            before = self.SEQUENCE.unpack_from(buffer, 0)[0]
+            if before % 2:
+                continue  # Server is mid-write
+            length = self.LENGTH.unpack_from(buffer, self.SEQUENCE.size)[0]
+            game_state = self.decode(buffer[self.PAYLOAD_START:self.PAYLOAD_START + length])
+            if self.SEQUENCE.unpack_from(buffer, 0)[0] == before:
+                return game_state
 
 class GameClient:
-    def __init__(self, port, player_id, player_num):
+    def __init__(self, port, player_id, player_num, protocol="json"):
         self.port = port
         self.player_id = player_id
         self.player_num = player_num
+        # Asked for in the hello: "json", or opt in to "delta", "binary" or "shm", whose
+        # states may list movements in a different order than the JSON state
+        self.protocol = protocol
         self.sock = None
+        self.buffer = bytearray()  # Bytes received after the last complete message
+        self.decoder = None  # Set once the server has agreed to "delta", "binary" or "shm"
     
     def connect(self):
         """Connect to the game server"""
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect(('localhost', self.port))
-            print(f"Connected to game server on port {self.port}")
-            return True
+            inherited_fd = os.environ.get("RTS_SOCKET_FD")
+            if inherited_fd is not None:
+                # Started with --transport socketpair: the connection is already open
+                self.sock = socket.socket(fileno=int(inherited_fd))
+                print("Connected to game server through an inherited socket")
+            else:
+                self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.sock.connect(('localhost', self.port))
+                print(f"Connected to game server on port {self.port}")
+            hello = {"hello": {"player_id": self.player_id, "protocol": self.protocol}}
+            return self.send_message(json.dumps(hello) + '\n')
         except Exception as e:
             print(f"Connection error: {e}")
             return False
@@ -28,21 +191,44 @@ class GameClient:
         try:
             while True:
                 # Receive game state
-                game_state_str = self.receive_message()
-                if not game_state_str:
-                    break
+                if isinstance(self.decoder, BinaryDecoder) and self.decoder.reads_frames:
+                    payload = self.receive_frame()
+                    if payload is None:
+                        break
+                    game_state = self.decoder.decode(payload)
+                else:
+                    game_state_str = self.receive_message()
+                    if not game_state_str:
+                        break
+                    
+                    try:
+                        # Parse JSON game state
+                        game_state = json.loads(game_state_str)
+                    except json.JSONDecodeError as e:
+                        print(f"JSON error: {e}")
+                        break
+                    if "welcome" in game_state:
+                        # States sent before this line were plain JSON, later ones use our protocol
+                        welcome = game_state["welcome"]
+                        if welcome["protocol"] == "delta":
+                            self.decoder = DeltaDecoder()
+                        elif welcome["protocol"] == "binary":
+                            self.decoder = BinaryDecoder(welcome["base_types"])
+                        elif welcome["protocol"] == "shm":
+                            self.decoder = SharedMemoryDecoder(welcome["base_types"], welcome["shm_name"])
+                        continue
+                    if "shm" in game_state:
+                        game_state = self.decoder.read(game_state)
                 
-                try:
-                    # Parse JSON game state
-                    game_state = json.loads(game_state_str)
-                    # Make move based on game state
-                    move = self.make_move(game_state)
-                    # Send move back to server
-                    move_str = json.dumps(move)
-                    self.send_message(move_str + '\n')
-                except json.JSONDecodeError as e:
-                    print(f"JSON error: {e}")
-                    break
+                if "delta" in game_state:
+                    game_state = self.decoder.decode(game_state["delta"])
+                # Make move based on game state
+                move = self.make_move(game_state)
+                if "version" in game_state:
+                    move["ack"] = game_state["version"]  # Which state this move answers
+                # Send move back to server
+                move_str = json.dumps(move)
+                self.send_message(move_str + '\n')
         except Exception as e:
             print(f"Error in run loop: {e}")
         finally:
@@ -50,17 +236,28 @@ class GameClient:
     
     def receive_message(self):
         """Receive a complete message from the server"""
-        result = ""
-        while True:
-            chunk = self.sock.recv(4096).decode('utf-8')
+        while b'\n' not in self.buffer:
+            chunk = self.sock.recv(65536)
             if not chunk:
                 return ""
-            
-            result += chunk
-            if '\n' in chunk:
-                break
+            self.buffer += chunk
         
-        return result
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return line.decode('utf-8')
+    
+    def receive_frame(self):
+        """Receive one length-prefixed binary frame; None once the server has closed"""
+        while True:
+            if len(self.buffer) >= 4:
+                length = int.from_bytes(self.buffer[:4], 'little')
+                if len(self.buffer) >= 4 + length:
+                    payload = self.buffer[4:4 + length]
+                    del self.buffer[:4 + length]
+                    return payload
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                return None
+            self.buffer += chunk
     
     def send_message(self, message):
         """Send a message to the server"""
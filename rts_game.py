@@ -1,22 +1,38 @@
-import pygame
 import random
 from enum import Enum
 from typing import List, Tuple, Dict, Optional
 import math
 import time
 import heapq
-import threading
+import itertools
+from collections import deque
+from array import array
+from operator import attrgetter
 import concurrent.futures
 import json
 import socket
+import asyncio
+import threading
+import queue
+import select
+import struct
+from multiprocessing import shared_memory
 import subprocess
 import os
 import sys
+import signal
+import runpy
+import traceback
 import importlib.util
 from uuid import uuid4
 import inspect
 
 BASE_MOVEMENT_SPEED = 0.375
+MAX_TROOP_RADIUS = 20  # Upper bound of TroopMovement.get_radius()
+BASE_MAX_UNITS = 100
+BASE_GROWTH_INTERVAL = 1.0  # Seconds per growth step
+
+FRAME_RATE = 60  # Main loop ticks per second
 
 FONT_PATH = "megamax-jonathan-too-font/MegamaxJonathanToo-YqOq2.ttf"
 
@@ -38,6 +54,16 @@ COLORS = {
     "fortified_aura": (255, 165, 0, 128),  # Orange aura for fortified bases
 }
 
+pygame = None  # Imported on demand by init_pygame so headless runs never load it
+
+def init_pygame():
+    """Import pygame the first time rendering is needed and return the module."""
+    global pygame
+    if pygame is None:
+        import pygame as pygame_module
+        pygame = pygame_module
+    return pygame
+
 def load_font(size):
     try:
         return pygame.font.Font(FONT_PATH, size)
@@ -49,6 +75,51 @@ class Player(Enum):
     PLAYER1 = 1
     PLAYER2 = 2
 
+class RealTimeClock:
+    """Wall-clock time source used by real-time matches."""
+    def now(self) -> float:
+        return time.time()
+    
+    def tick(self):
+        """Real time advances on its own."""
+        pass
+
+class VirtualClock:
+    """Fixed-timestep simulation time that only advances when the game loop ticks it."""
+    def __init__(self, step: float = 1.0 / FRAME_RATE, start: float = 0.0):
+        self.step = step
+        self.start = start
+        self.ticks = 0
+        self.current = start
+    
+    def now(self) -> float:
+        return self.current
+    
+    def tick(self):
+        """Advance simulation time by one fixed step."""
+        self.ticks += 1
+        self.current = self.start + self.ticks * self.step  # No drift from repeated float additions
+
+REAL_TIME_CLOCK = RealTimeClock()
+
+class EventQueue:
+    """Min-heap of timed engine events, released in (time, scheduling order) order."""
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()  # Tie-breaker so equal times keep scheduling order
+    
+    def schedule(self, event_time: float, event):
+        heapq.heappush(self._heap, (event_time, next(self._counter), event))
+    
+    def pop_due(self, current_time: float):
+        """Yield (event_time, event) for every event due at or before current_time."""
+        while self._heap and self._heap[0][0] <= current_time:
+            event_time, _, event = heapq.heappop(self._heap)
+            yield event_time, event
+    
+    def __len__(self):
+        return len(self._heap)
+
 def a_star_search(grid, start, goal):
     """A* pathfinding algorithm to find the shortest path from start to goal."""
     def heuristic(a, b):
@@ -89,55 +160,159 @@ def a_star_search(grid, start, goal):
     print("No path found")
     return []
 
-class TroopMovement:
-    def __init__(self, source_x: int, source_y: int, target_x: int, target_y: int, 
-                 units: int, owner: Player, duration: float = 1.0, path: List[Tuple[int, int]] = None,
-                 speed_multiplier: float = 1.0):
-        self.source_x = source_x
-        self.source_y = source_y
-        self.target_x = target_x
-        self.target_y = target_y
-        self.units = units
-        self.owner = owner
-        self.start_time = time.time()
-        # Apply speed multiplier to duration (faster speed = shorter duration)
-        self.duration = duration / speed_multiplier
-        self.completed = False
-        self.path = path if path else [(source_x, source_y), (target_x, target_y)]
-        self.current_path_index = 0
-        self.defeated = False  # Flag to track if this troop has been defeated in combat
-        self.speed_multiplier = speed_multiplier  # Store the speed multiplier for reference
+def bfs_base_paths(grid, start):
+    """Breadth-first search from start over empty cells.
     
-    def update(self):
-        """Update movement progress and return True if movement is complete"""
-        if not self.completed:
-            elapsed = time.time() - self.start_time
-            if elapsed >= self.duration:
-                self.completed = True
-                return True
-            # Update current path index based on elapsed time
-            total_path_length = len(self.path) - 1
-            if total_path_length == 0:
-                self.completed = True
-                return True
-            segment_duration = self.duration / total_path_length
-            self.current_path_index = min(int(elapsed / segment_duration), total_path_length)
-        return False
-    
-    def get_position(self):
-        """Get current position of the troop movement"""
-        elapsed = time.time() - self.start_time
-        progress = min(elapsed / self.duration, 1.0)
-        
-        total_path_length = len(self.path) - 1
+    Returns {base_position: path} with a shortest path from start to every base
+    reachable from it. Bases are path endpoints only, never passed through.
+    """
+    came_from = {start: None}
+    frontier = [start]
+    paths = {start: [start]}
+    
+    while frontier:
+        next_frontier = []
+        for current in frontier:
+            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                neighbor = (current[0] + dx, current[1] + dy)
+                if not (0 <= neighbor[0] < len(grid) and 0 <= neighbor[1] < len(grid[0])):
+                    continue
+                if neighbor in came_from:
+                    continue
+                came_from[neighbor] = current
+                if grid[neighbor[1]][neighbor[0]] == 0:
+                    next_frontier.append(neighbor)
+                else:
+                    # Reached a base: record the path but do not expand through it
+                    path = [neighbor]
+                    step = current
+                    while step is not None:
+                        path.append(step)
+                        step = came_from[step]
+                    path.reverse()
+                    paths[neighbor] = path
+        frontier = next_frontier
+    
+    return paths
+
+def cell_center(x: int, y: int) -> Tuple[int, int]:
+    """Pixel coordinates of the centre of grid cell (x, y)."""
+    return x * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2, y * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
+
+PLAYERS = tuple(Player)  # Indexed by Player.value, for owner codes kept in stores
+
+BASE_TYPE_BASE = 0
+BASE_TYPE_SPECIAL = 1
+BASE_TYPE_SPEEDY = 2
+BASE_TYPE_FORTIFIED = 3
+BASE_TYPE_NAMES = ("Base", "SpecialBase", "SpeedyBase", "FortifiedBase")  # Indexed by type code
+
+def store_column(name):
+    """Property reading and writing a view's row in the named column of its store."""
+    column = attrgetter(name)  # Bound once; stores never replace their column arrays
+    def get(self):
+        return column(self._store)[self._index]
+    def set(self, value):
+        column(self._store)[self._index] = value
+    return property(get, set)
+
+def owner_column(name):
+    """Like store_column, but the column holds Player values and the view sees Player members."""
+    column = attrgetter(name)
+    def get(self):
+        return PLAYERS[column(self._store)[self._index]]
+    def set(self, value):
+        column(self._store)[self._index] = value.value
+    return property(get, set)
+
+def flag_column(name):
+    """Like store_column, but the column holds 0/1 bytes and the view sees booleans."""
+    column = attrgetter(name)
+    def get(self):
+        return bool(column(self._store)[self._index])
+    def set(self, value):
+        column(self._store)[self._index] = bool(value)
+    return property(get, set)
+
+class TroopStore:
+    """Structure-of-arrays storage for troop movements; TroopMovement objects are views of one row.
+    
+    Rows are append-only so a view held by a stale event or another thread never
+    aliases a newer movement. Paths are interned and their pixel waypoints computed
+    once per distinct path. The per-tick work (position snapshots, contact
+    prediction, arrivals and battles) runs on rows here, without views.
+    """
+    def __init__(self, clock=None):
+        self.clock = clock or REAL_TIME_CLOCK
+        self.start_time = array("d")
+        self.duration = array("d")
+        self.units = []  # Plain list: unit counts may be whatever number a player asked for
+        self.owner = array("b")
+        self.path_id = array("i")
+        self.speed_multiplier = array("d")
+        self.defeated = array("b")
+        self.slot = array("i")  # Index in GameState.troop_movements, -1 once out of flight
+        self.version = array("i")
+        self.position = []  # (x, y, progress) snapshot per row
+        self.in_flight = array("i")  # Rows in flight, in GameState.troop_movements order
+        self.transit_units = [0] * len(PLAYERS)  # Units of in-flight rows, indexed by owner
+        self.paths = []  # Interned paths, indexed by path id
+        self.waypoints = []  # Pixel coordinates of each interned path
+        self.path_ids = {}
+    
+    def intern_path(self, path) -> int:
+        key = tuple(tuple(cell) for cell in path)
+        path_id = self.path_ids.get(key)
+        if path_id is None:
+            path_id = len(self.paths)
+            self.path_ids[key] = path_id
+            self.paths.append(key)
+            self.waypoints.append([cell_center(x, y) for x, y in key])
+        return path_id
+    
+    def add(self, start_time: float, duration: float, units: int, owner: int, path_id: int,
+            speed_multiplier: float) -> int:
+        self.start_time.append(start_time)
+        self.duration.append(duration)
+        self.units.append(units)
+        self.owner.append(owner)
+        self.path_id.append(path_id)
+        self.speed_multiplier.append(speed_multiplier)
+        self.defeated.append(False)
+        self.slot.append(-1)
+        self.version.append(0)
+        self.position.append(None)
+        return len(self.units) - 1
+    
+    def arrival_time(self, row: int) -> float:
+        """Time at which a row reaches its target (at once for a single-cell path)."""
+        if len(self.paths[self.path_id[row]]) <= 1:
+            return self.start_time[row]
+        return self.start_time[row] + self.duration[row]
+    
+    def radius(self, row: int) -> float:
+        """Collision radius of a row, growing with its units"""
+        return 10 + min(self.units[row] * 0.2, MAX_TROOP_RADIUS - 10)
+    
+    def segment_times(self, row: int) -> List[float]:
+        """Times at which a row turns onto the next segment of its path."""
+        start_time = self.start_time[row]
+        duration = self.duration[row]
+        total_path_length = len(self.waypoints[self.path_id[row]]) - 1
+        return [start_time + duration * k / total_path_length for k in range(1, total_path_length)]
+    
+    def position_at(self, row: int, current_time: float):
+        """Return (x, y, progress) of a row at the given time along its waypoints"""
+        elapsed = current_time - self.start_time[row]
+        progress = min(elapsed / self.duration[row], 1.0)
+        
+        waypoints = self.waypoints[self.path_id[row]]
+        total_path_length = len(waypoints) - 1
         if total_path_length == 0:
             # If there's no movement needed (path length is 1), return the target position
-            target_pos = self.path[-1]
-            target_grid_x = target_pos[0] * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
-            target_grid_y = target_pos[1] * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
-            return target_grid_x, target_grid_y, progress
+            target_x, target_y = waypoints[-1]
+            return target_x, target_y, progress
         
-        segment_duration = self.duration / total_path_length
         segment_index = int(progress * total_path_length)
         segment_progress = (progress * total_path_length) % 1.0
         
@@ -145,47 +320,319 @@ class TroopMovement:
             segment_index = total_path_length - 1
             segment_progress = 1.0
         
-        start_pos = self.path[segment_index]
-        end_pos = self.path[segment_index + 1]
-        
-        # Calculate grid positions
-        start_grid_x = start_pos[0] * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
-        start_grid_y = start_pos[1] * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
-        end_grid_x = end_pos[0] * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
-        end_grid_y = end_pos[1] * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
+        start_x, start_y = waypoints[segment_index]
+        end_x, end_y = waypoints[segment_index + 1]
         
-        current_x = start_grid_x + (end_grid_x - start_grid_x) * segment_progress
-        current_y = start_grid_y + (end_grid_y - start_grid_y) * segment_progress
+        current_x = start_x + (end_x - start_x) * segment_progress
+        current_y = start_y + (end_y - start_y) * segment_progress
         
         return current_x, current_y, progress
     
+    def snapshot_positions(self, current_time: float):
+        """Refresh the position snapshot of every row in flight."""
+        position = self.position
+        position_at = self.position_at
+        for row in self.in_flight:
+            position[row] = position_at(row, current_time)
+    
+    def __len__(self):
+        return len(self.units)
+
+class TroopMovement:
+    __slots__ = ("_store", "_index")
+    
+    start_time = store_column("start_time")
+    duration = store_column("duration")
+    owner = owner_column("owner")
+    path_id = store_column("path_id")
+    speed_multiplier = store_column("speed_multiplier")  # Store the speed multiplier for reference
+    defeated = flag_column("defeated")  # Flag to track if this troop has been defeated in combat
+    version = store_column("version")  # Bumped whenever units change, invalidating predicted battles
+    position = store_column("position")  # Snapshot refreshed once per game tick
+    
+    def __init__(self, source_x: int, source_y: int, target_x: int, target_y: int, 
+                 units: int, owner: Player, duration: float = 1.0, path: List[Tuple[int, int]] = None,
+                 speed_multiplier: float = 1.0, clock=None, store: TroopStore = None):
+        self._store = store if store is not None else TroopStore(clock)
+        path = path if path else [(source_x, source_y), (target_x, target_y)]
+        # Apply speed multiplier to duration (faster speed = shorter duration)
+        self._index = self._store.add(self._store.clock.now(), duration / speed_multiplier, units, owner.value,
+                                      self._store.intern_path(path), speed_multiplier)
+        self.position = self.position_at(self.start_time)
+    
+    @property
+    def clock(self):
+        return self._store.clock
+    
+    @property
+    def row(self) -> int:
+        """Row in the troop store; unique for the whole game"""
+        return self._index
+    
+    @property
+    def path(self) -> Tuple[Tuple[int, int], ...]:
+        return self._store.paths[self.path_id]
+    
+    @property
+    def waypoints(self) -> List[Tuple[int, int]]:
+        """Pixel coordinates of the path"""
+        return self._store.waypoints[self.path_id]
+    
+    @property
+    def source_x(self) -> int:
+        return self.path[0][0]
+    
+    @property
+    def source_y(self) -> int:
+        return self.path[0][1]
+    
+    @property
+    def target_x(self) -> int:
+        return self.path[-1][0]
+    
+    @property
+    def target_y(self) -> int:
+        return self.path[-1][1]
+    
+    @property
+    def units(self):
+        return self._store.units[self._index]
+    
+    @units.setter
+    def units(self, value):
+        store = self._store
+        if store.slot[self._index] >= 0:
+            store.transit_units[store.owner[self._index]] += value - store.units[self._index]
+        store.units[self._index] = value
+    
+    @property
+    def slot(self) -> Optional[int]:
+        """Index in GameState.troop_movements while in flight, otherwise None"""
+        slot = self._store.slot[self._index]
+        return None if slot < 0 else slot
+    
+    @slot.setter
+    def slot(self, value: Optional[int]):
+        store = self._store
+        was_in_flight = store.slot[self._index] >= 0
+        store.slot[self._index] = -1 if value is None else value
+        # Keep the per-owner transit total in step as the row enters or leaves flight
+        if was_in_flight != (value is not None):
+            sign = 1 if value is not None else -1
+            store.transit_units[store.owner[self._index]] += sign * store.units[self._index]
+    
+    @property
+    def arrival_time(self) -> float:
+        """Time at which the troop reaches its target (at once for a single-cell path)."""
+        return self._store.arrival_time(self._index)
+    
+    def update(self, current_time: float = None):
+        """Snapshot the position for this tick; arrivals are handled by events"""
+        if current_time is None:
+            current_time = self.clock.now()
+        self.position = self._store.position_at(self._index, current_time)
+    
+    def segment_times(self) -> List[float]:
+        """Times at which the troop turns onto the next segment of its path."""
+        return self._store.segment_times(self._index)
+    
+    def position_at(self, current_time: float):
+        """Return (x, y, progress) of the troop at the given time along its waypoints"""
+        return self._store.position_at(self._index, current_time)
+    
+    def get_position(self):
+        """Get the position of the troop movement as of the last game tick"""
+        return self.position
+    
     def get_radius(self):
         """Get the collision radius of the troop based on its size"""
-        return 10 + min(self.units * 0.2, 10)   
+        return self._store.radius(self._index)
+
+class BaseStore:
+    """Structure-of-arrays storage for bases; Base objects are views of one row.
+    
+    Growth is lazy: a row stores its units as of last_growth_time, and reads add
+    the whole growth intervals elapsed since then. Stored units only change on
+    writes, and on a cap event when a growing row reaches BASE_MAX_UNITS.
+    """
+    def __init__(self, clock=None):
+        self.clock = clock or REAL_TIME_CLOCK
+        self.x = array("i")
+        self.y = array("i")
+        self.owner = array("b")
+        self.units = []
+        self.type_code = array("b")
+        self.growth_rate = array("i")
+        self.last_growth_time = array("d")
+        self.cooldown = array("d")
+        self.is_growing = array("b")
+        self.growth_version = array("i")  # Bumped on every growth change, invalidating older cap events
+        self.written_at = array("d")  # Time of the last write; growth shows from the next tick on
+        self.fragments = []  # (shown record, encoded JSON object) of each row, see json_fragment
+        self.base_count = [0] * len(PLAYERS)  # Running totals indexed by owner
+        self.base_units = [0] * len(PLAYERS)  # Stored units only; see player_units for growth
+        self.growing = [set() for _ in PLAYERS]  # Growing rows, by owner
+        self.cap_events = EventQueue()  # (row, growth_version) due when the row reaches max units
+    
+    def add(self, x: int, y: int, owner: int, units: int, type_code: int) -> int:
+        self.base_count[owner] += 1
+        self.base_units[owner] += units
+        self.x.append(x)
+        self.y.append(y)
+        self.owner.append(owner)
+        self.units.append(units)
+        self.type_code.append(type_code)
+        self.growth_rate.append(0)
+        self.last_growth_time.append(self.clock.now())
+        self.cooldown.append(0)
+        self.is_growing.append(False)
+        self.growth_version.append(0)
+        self.written_at.append(self.clock.now())
+        self.fragments.append(None)
+        return len(self.units) - 1
+    
+    def units_at(self, index: int, current_time: float):
+        """Units of a row at current_time: stored units plus whole growth intervals, capped."""
+        units = self.units[index]
+        if self.is_growing[index] and current_time > self.written_at[index]:
+            growth_cycles = int((current_time - self.last_growth_time[index]) / BASE_GROWTH_INTERVAL)
+            if growth_cycles > 0:
+                return min(units + self.growth_rate[index] * growth_cycles, BASE_MAX_UNITS)
+        return units
+    
+    def materialize(self, index: int, current_time: float):
+        """Fold growth due by current_time into the stored units, as a per-frame update would."""
+        if not self.is_growing[index] or current_time <= self.written_at[index]:
+            return
+        growth_cycles = int((current_time - self.last_growth_time[index]) / BASE_GROWTH_INTERVAL)
+        if growth_cycles > 0:
+            units = min(self.units[index] + self.growth_rate[index] * growth_cycles, BASE_MAX_UNITS)
+            self.base_units[self.owner[index]] += units - self.units[index]
+            self.units[index] = units
+            self.last_growth_time[index] += growth_cycles * BASE_GROWTH_INTERVAL
+    
+    def refresh_growth(self, index: int):
+        """Recompute whether a row grows and schedule its cap event if it does."""
+        self.growth_version[index] += 1
+        owner = self.owner[index]
+        for growing in self.growing:
+            growing.discard(index)
+        is_growing = (owner != Player.NEUTRAL.value and self.growth_rate[index] > 0
+                      and self.units[index] < BASE_MAX_UNITS)
+        self.is_growing[index] = is_growing
+        if is_growing:
+            self.growing[owner].add(index)
+            cycles_to_cap = math.ceil((BASE_MAX_UNITS - self.units[index]) / self.growth_rate[index])
+            cap_time = self.last_growth_time[index] + cycles_to_cap * BASE_GROWTH_INTERVAL
+            self.cap_events.schedule(cap_time, (index, self.growth_version[index]))
+    
+    def write(self, index: int, column: str, value):
+        """Write one growth-relevant column of a row, keeping totals and cap events in step."""
+        current_time = self.clock.now()
+        self.materialize(index, current_time)
+        self.written_at[index] = current_time
+        if column == "units":
+            self.base_units[self.owner[index]] += value - self.units[index]
+        elif column == "owner":
+            # Move this base's count and units over to the new owner's running totals
+            self.base_count[self.owner[index]] -= 1
+            self.base_units[self.owner[index]] -= self.units[index]
+            self.base_count[value] += 1
+            self.base_units[value] += self.units[index]
+        getattr(self, column)[index] = value
+        self.refresh_growth(index)
+    
+    def json_fragment(self, index: int, record) -> bytes:
+        """Encoded JSON object of a row showing record, a GameSnapshot base; re-encoded only when it changed.
+        
+        The cache is checked against the record rather than the live row, so
+        a snapshot encoded on another thread still gets its own tick's values.
+        """
+        # Compared with the units' type too: 5 == 5.0, but they encode differently
+        key = (record, type(record[3]))
+        cached = self.fragments[index]
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        x, y, owner, units, growth_rate, type_code = record
+        fragment = json.dumps({
+            "x": x,
+            "y": y,
+            "owner": owner,
+            "units": units,
+            "growth_rate": growth_rate,
+            "type": BASE_TYPE_NAMES[type_code],
+        }).encode()
+        self.fragments[index] = (key, fragment)
+        return fragment
+    
+    def process_due_caps(self, current_time: float):
+        """Stop growth of every row that has reached max units by current_time."""
+        # Collected first: a row that float rounding leaves one step short is
+        # rescheduled for the same instant and must wait for the next tick
+        for _, (index, version) in list(self.cap_events.pop_due(current_time)):
+            if version == self.growth_version[index]:
+                self.materialize(index, current_time)
+                self.refresh_growth(index)
+    
+    def player_units(self, owner: int, current_time: float):
+        """Units an owner holds in bases at current_time, including lazily pending growth."""
+        pending = sum(self.units_at(index, current_time) - self.units[index] for index in self.growing[owner])
+        return self.base_units[owner] + pending
+    
+    def __len__(self):
+        return len(self.units)
+
+def growth_column(name):
+    """Property for a column that affects growth; writes go through BaseStore.write."""
+    def get(self):
+        return getattr(self._store, name)[self._index]
+    def set(self, value):
+        self._store.write(self._index, name, value)
+    return property(get, set)
 
 class Base:
-    def __init__(self, x: int, y: int, owner: Player, units: int):
-        self.x = x
-        self.y = y
-        self.owner = owner
-        self.units = units
-        self.growth_rate = 1 if owner != Player.NEUTRAL else 0
-        self.max_units = 100
-        self.last_growth_time = time.time()
-        self.growth_interval = 1.0  # Growth per second
-        self.cooldown = 0  # Cooldown time before next troops can be sent
+    __slots__ = ("_store", "_index")
+    
+    type_code = BASE_TYPE_BASE
+    owned_growth_rate = 1  # Units per growth interval once a player owns the base
+    max_units = BASE_MAX_UNITS
+    growth_interval = BASE_GROWTH_INTERVAL  # Growth per second
+    
+    x = store_column("x")
+    y = store_column("y")
+    growth_rate = growth_column("growth_rate")
+    last_growth_time = growth_column("last_growth_time")
+    cooldown = store_column("cooldown")  # Cooldown time before next troops can be sent
+    
+    def __init__(self, x: int, y: int, owner: Player, units: int, clock=None, store: BaseStore = None):
+        self._store = store if store is not None else BaseStore(clock)
+        self._index = self._store.add(x, y, owner.value, units, self.type_code)
+        self.growth_rate = self.owned_growth_rate if owner != Player.NEUTRAL else 0
+    
+    @property
+    def clock(self):
+        return self._store.clock
+    
+    @property
+    def owner(self) -> Player:
+        return PLAYERS[self._store.owner[self._index]]
+    
+    @owner.setter
+    def owner(self, value: Player):
+        self._store.write(self._index, "owner", value.value)
+    
+    @property
+    def units(self):
+        """Current units, including growth since the last stored value"""
+        return self._store.units_at(self._index, self._store.clock.now())
+    
+    @units.setter
+    def units(self, value):
+        self._store.write(self._index, "units", value)
     
     def update(self, current_time):
-        """Update base units based on real time"""
-        if self.owner != Player.NEUTRAL and self.units < self.max_units:
-            elapsed = current_time - self.last_growth_time
-            if elapsed >= self.growth_interval:
-                # Add units based on how many growth intervals have passed
-                growth_cycles = int(elapsed / self.growth_interval)
-                self.units += self.growth_rate * growth_cycles
-                self.units = min(self.units, self.max_units)
-                # Update the last growth time
-                self.last_growth_time += growth_cycles * self.growth_interval
+        """Fold growth due by current_time into the stored units (reads are already up to date)"""
+        self._store.materialize(self._index, current_time)
         
         # Update cooldown
         if self.cooldown > 0:
@@ -203,8 +650,8 @@ class Base:
                 self.owner = owner
                 self.units = units - self.units
                 
-                self.growth_rate = 1  # Start growing now that it's owned
-                self.last_growth_time = time.time()  # Reset growth timer
+                self.growth_rate = self.owned_growth_rate  # Start growing now that it's owned
+                self.last_growth_time = self.clock.now()  # Reset growth timer
             else:
                 # Attack fails: Reduce base units
                 self.units -= units
@@ -219,8 +666,8 @@ class Base:
             if units > self.units:
                 self.owner = owner
                 self.units = units - self.units
-                self.growth_rate = 1  # Reset growth rate for new owner
-                self.last_growth_time = time.time()  # Reset growth timer
+                self.growth_rate = self.owned_growth_rate  # Reset growth rate for new owner
+                self.last_growth_time = self.clock.now()  # Reset growth timer
             else:
                 self.units -= units
     
@@ -233,23 +680,16 @@ class Base:
         return 1.0  # Base class sends normal number of troops
 
 class SpecialBase(Base):
-    def __init__(self, x: int, y: int, owner: Player, units: int):
-        super().__init__(x, y, owner, units)
-        self.growth_rate = 2 if owner != Player.NEUTRAL else 0  
-    
-    def update(self, current_time):
-        """Update special base units with 2x growth rate"""
-        # Update growth rate based on ownership
-        if self.owner != Player.NEUTRAL:
-            self.growth_rate = 2
-        else:
-            self.growth_rate = 0
-            
-        super().update(current_time)  
+    __slots__ = ()
+    type_code = BASE_TYPE_SPECIAL
+    owned_growth_rate = 2  # Special bases grow at twice the normal rate
 
 class SpeedyBase(Base):
-    def __init__(self, x: int, y: int, owner: Player, units: int):
-        super().__init__(x, y, owner, units)
+    __slots__ = ()
+    type_code = BASE_TYPE_SPEEDY
+    
+    def __init__(self, x: int, y: int, owner: Player, units: int, clock=None, store: BaseStore = None):
+        super().__init__(x, y, owner, units, clock, store)
         self.growth_rate = 1 if owner != Player.NEUTRAL else 0
     
     def get_speed_multiplier(self) -> float:
@@ -257,14 +697,31 @@ class SpeedyBase(Base):
         return 1.5  # Troops move 1.5 times as fast (slowed down from 2.0)
 
 class FortifiedBase(Base):
-    def __init__(self, x: int, y: int, owner: Player, units: int):
-        super().__init__(x, y, owner, units)
+    __slots__ = ()
+    type_code = BASE_TYPE_FORTIFIED
+    
+    def __init__(self, x: int, y: int, owner: Player, units: int, clock=None, store: BaseStore = None):
+        super().__init__(x, y, owner, units, clock, store)
         self.growth_rate = 1 if owner != Player.NEUTRAL else 0
     
     def send_troop_multiplier(self) -> float:
         """Return the multiplier for number of troops that can be sent from this base."""
         return 2  # Can send twice as many troops at once (removed decimal point)
 
+class BurstOrder:
+    """A move still being sent out of its source base one burst at a time."""
+    def __init__(self, source_x: int, source_y: int, target_x: int, target_y: int, units: int,
+                 player: Player, path: List[Tuple[int, int]], burst_size: int, speed_multiplier: float):
+        self.source_x = source_x
+        self.source_y = source_y
+        self.target_x = target_x
+        self.target_y = target_y
+        self.remaining_units = units
+        self.player = player
+        self.path = path
+        self.burst_size = burst_size
+        self.speed_multiplier = speed_multiplier
+
 def is_valid_route(grid, route, sourcex, sourcey, targetx, targety):
     """Check if the specified route is valid (all cells are within bounds and passable)."""
     if not (isinstance(route, list)):
@@ -284,18 +741,30 @@ def is_valid_route(grid, route, sourcex, sourcey, targetx, targety):
 
 
 class GameState:
-    def __init__(self, size: int = 8, max_duration: int = 60):
+    def __init__(self, size: int = 8, max_duration: int = 60, clock=None):
         self.size = size
+        self.clock = clock or REAL_TIME_CLOCK  # Every engine object reads time from this clock
         self.grid = [[0 for _ in range(size)] for _ in range(size)] 
         self.bases = []
+        self.base_store = BaseStore(self.clock)  # Column storage behind every Base in self.bases
+        self.troop_store = TroopStore(self.clock)  # Column storage behind every TroopMovement
         self.turn = 0  
-        self.troop_movements = []  # List of active troop movements
-        self.last_update_time = time.time()
-        self.start_time = time.time()  
+        self.troop_movements = []  # List of active troop movements (unordered, see add/remove_troop_movement)
+        self.troop_events = EventQueue()  # Arrivals and predicted battles of movements in flight
+        self.burst_events = EventQueue()  # BurstOrders waiting to release their next burst
+        self.burst_interval = 1.0  # Delay between bursts of the same move (seconds)
+        self.last_update_time = self.clock.now()
+        self.start_time = self.clock.now()
         self.movement_cooldown = 0.3  # Cooldown between sending troops (seconds)
         self.base_cooldowns = {}  # Track cooldowns for each base {(x,y): time}
         self.max_duration = max_duration  # Maximum game duration in seconds
+        self.grid_version = 0  # Bumped whenever a base is placed on the grid
+        self.base_paths = {}  # {(source, target): shortest path} between all bases
+        self.base_paths_version = -1  # grid_version the path table was built for
+        self.pending_commands = deque()  # (player value, method, args) queued by strategy threads
+        self.last_snapshot = None  # GameSnapshot of the latest tick a player was shown
         self.initialize_bases()
+        self.build_base_paths()
 
     def initialize_bases(self):
         # Create player starting bases at opposite corners
@@ -429,29 +898,60 @@ class GameState:
         return False
     
     def add_base(self, x: int, y: int, owner: Player, units: int):
-        base = Base(x, y, owner, units)
+        base = Base(x, y, owner, units, self.clock, self.base_store)
         self.grid[y][x] = base
+        self.grid_version += 1
         self.bases.append(base)
         self.base_cooldowns[(x, y)] = 0  # Initialize cooldown
     
     def add_special_base(self, x: int, y: int, owner: Player, units: int):
-        base = SpecialBase(x, y, owner, units)
+        base = SpecialBase(x, y, owner, units, self.clock, self.base_store)
         self.grid[y][x] = base
+        self.grid_version += 1
         self.bases.append(base)
         self.base_cooldowns[(x, y)] = 0  # Initialize cooldown
     
     def add_speedy_base(self, x: int, y: int, owner: Player, units: int):
-        base = SpeedyBase(x, y, owner, units)
+        base = SpeedyBase(x, y, owner, units, self.clock, self.base_store)
         self.grid[y][x] = base
+        self.grid_version += 1
         self.bases.append(base)
         self.base_cooldowns[(x, y)] = 0  # Initialize cooldown
     
     def add_fortified_base(self, x: int, y: int, owner: Player, units: int):
-        base = FortifiedBase(x, y, owner, units)
+        base = FortifiedBase(x, y, owner, units, self.clock, self.base_store)
         self.grid[y][x] = base
+        self.grid_version += 1
         self.bases.append(base)
         self.base_cooldowns[(x, y)] = 0  # Initialize cooldown
     
+    def build_base_paths(self):
+        """Precompute shortest paths between every pair of bases with one BFS per base."""
+        self.base_paths = {}
+        for base in self.bases:
+            source = (base.x, base.y)
+            for target, path in bfs_base_paths(self.grid, source).items():
+                self.base_paths[(source, target)] = path
+        self.base_paths_version = self.grid_version
+    
+    def get_base_path(self, source: Tuple[int, int], target: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Shortest path between two bases, or [] if none; rebuilt only if the grid changed."""
+        if self.base_paths_version != self.grid_version:
+            self.build_base_paths()
+        return self.base_paths.get((source, target), [])
+    
+    def get_player_base_count(self, player: Player) -> int:
+        """Number of bases a player owns, kept up to date by the base store"""
+        return self.base_store.base_count[player.value]
+    
+    def get_player_base_units(self, player: Player):
+        """Units a player holds in bases, from the base store's totals plus pending growth"""
+        return self.base_store.player_units(player.value, self.clock.now())
+    
+    def get_player_transit_units(self, player: Player):
+        """Units a player has in flight, kept up to date by the troop store"""
+        return self.troop_store.transit_units[player.value]
+    
     def get_player_bases(self, player: Player) -> List[Base]:
         return [base for base in self.bases if base.owner == player]
     
@@ -470,7 +970,7 @@ class GameState:
         """Process a player's move in bursts of 10 units per movement."""
         source_base = self.get_base(source_x, source_y)
         target_base = self.get_base(target_x, target_y)
-        current_time = time.time()
+        current_time = self.clock.now()
         
         # Check if the move is valid
         if not source_base or not target_base:
@@ -499,7 +999,7 @@ class GameState:
         if custom_route and is_valid_route(self.grid, custom_route, source_x, source_y, target_x, target_y):
             path = custom_route
         else:
-            path = a_star_search(self.grid, source_pos, (target_x, target_y))
+            path = self.get_base_path(source_pos, (target_x, target_y))
             
         if not path:
             return False  # No valid path found
@@ -508,111 +1008,173 @@ class GameState:
 
         speed_multiplier = source_base.get_speed_multiplier()
         
-        # Store the remaining units in a mutable list to avoid nonlocal issues
-        remaining_units = [units]
-
         # Send troops in bursts - use troop_multiplier to determine burst size
-        def send_bursts():
-            while remaining_units[0] > 0:
-                # Get the current state of the base
-                current_base = self.get_base(source_x, source_y)
-                if not current_base or current_base.owner != player:
-                    break  # Stop sending if base no longer belongs to player
-                
-                # Calculate how many units to send in this burst
-                burst_units = min(int(10 * troop_multiplier), remaining_units[0])
-                burst_units = min(burst_units, current_base.units - 1)  # Don't leave base empty
-                
-                if burst_units <= 0:
-                    break  # No more units to send
-                
-                # Deduct the troops from the base
-                current_base.units -= burst_units
-                remaining_units[0] -= burst_units
-                
-                # Calculate movement duration based on distance
-                duration = len(path) * BASE_MOVEMENT_SPEED
-                
-                # Create troop movement for each burst with speed multiplier
-                self.troop_movements.append(
-                    TroopMovement(source_x, source_y, target_x, target_y, burst_units, player, duration, path, speed_multiplier)
-                )
-                
-                print(f"Player {player} sending {burst_units} troops from ({source_x},{source_y}) to ({target_x},{target_y}) at {speed_multiplier}x speed")
-                
-                time.sleep(1)  # 1s delay between bursts
-
-        threading.Thread(target=send_bursts).start()
+        order = BurstOrder(source_x, source_y, target_x, target_y, units, player, path,
+                           int(10 * troop_multiplier), speed_multiplier)
+        self.release_burst(order, current_time)
         return True
 
+    def release_burst(self, order: BurstOrder, current_time: float):
+        """Send the next burst of an order and schedule the one after it, if any."""
+        # Get the current state of the base
+        current_base = self.get_base(order.source_x, order.source_y)
+        if not current_base or current_base.owner != order.player:
+            return  # Stop sending if base no longer belongs to player
+        
+        # Calculate how many units to send in this burst
+        burst_units = min(order.burst_size, order.remaining_units)
+        burst_units = min(burst_units, current_base.units - 1)  # Don't leave base empty
+        
+        if burst_units <= 0:
+            return  # No more units to send
+        
+        # Deduct the troops from the base
+        current_base.units -= burst_units
+        order.remaining_units -= burst_units
+        
+        # Calculate movement duration based on distance
+        duration = len(order.path) * BASE_MOVEMENT_SPEED
+        
+        # Create troop movement for each burst with speed multiplier
+        self.add_troop_movement(
+            TroopMovement(order.source_x, order.source_y, order.target_x, order.target_y, burst_units,
+                          order.player, duration, order.path, order.speed_multiplier, self.clock, self.troop_store)
+        )
+        
+        print(f"Player {order.player} sending {burst_units} troops from ({order.source_x},{order.source_y}) to ({order.target_x},{order.target_y}) at {order.speed_multiplier}x speed")
+        
+        if order.remaining_units > 0:
+            self.burst_events.schedule(current_time + self.burst_interval, order)
+
+    def add_troop_movement(self, movement: TroopMovement):
+        """Put a movement in flight and schedule its arrival and battles."""
+        movement.slot = len(self.troop_movements)
+        self.troop_movements.append(movement)
+        self.troop_store.in_flight.append(movement.row)
+        self.troop_events.schedule(movement.arrival_time, ("arrival", movement.row))
+        self.schedule_battles(movement.row, movement.start_time)
+    
+    def schedule_battles(self, row: int, from_time: float):
+        """Schedule a battle at the first contact between a troop store row and each enemy in flight."""
+        store = self.troop_store
+        owner = store.owner[row]
+        for other in store.in_flight:
+            if store.owner[other] == owner:
+                continue
+            contact_time = predict_contact_time(store, row, other, from_time)
+            if contact_time is not None:
+                self.troop_events.schedule(contact_time, ("battle", row, other, store.version[row], store.version[other]))
+    
+    def remove_troop_movement(self, movement: TroopMovement):
+        """Take a movement out of flight in O(1) by moving the last one into its slot."""
+        if movement.slot is None:
+            return  # Already removed
+        last = self.troop_movements.pop()
+        last_row = self.troop_store.in_flight.pop()
+        if last is not movement:
+            last.slot = movement.slot
+            self.troop_movements[movement.slot] = last
+            self.troop_store.in_flight[movement.slot] = last_row
+        movement.slot = None
+    
+    def release_due_bursts(self, current_time: float):
+        """Release every burst whose send time has come, in scheduling order."""
+        for release_time, order in self.burst_events.pop_due(current_time):
+            self.release_burst(order, release_time)
     
     def update(self):
-        """Update the game state in real-time"""
-        current_time = time.time()
+        """Update the game state to the current clock time"""
+        current_time = self.clock.now()
         delta_time = current_time - self.last_update_time
         self.last_update_time = current_time
         
-        for base in self.bases:
-            base.update(current_time)
+        # Moves decided since the last update are applied here, on the main loop only
+        self.apply_pending_commands()
+        
+        # Base growth is computed on read; only bases reaching max units need work
+        self.base_store.process_due_caps(current_time)
         
-        self.update_troop_movements()
+        self.release_due_bursts(current_time)
+        self.update_troop_movements(current_time)
         
         self.turn += 1
     
-    def update_troop_movements(self):
-        """Update troop movement animations, check for collisions, and process completed movements"""
-        completed = []
-        defeated = []
-        
-        # First update all movements
-        for movement in self.troop_movements:
-            if movement.update():
-                # When a movement completes, mark it
-                completed.append(movement)
-        
-        # Check for collisions between troops of opposing players
-        for i, movement1 in enumerate(self.troop_movements):
-            if movement1.defeated:
-                continue
-                
-            for j, movement2 in enumerate(self.troop_movements[i+1:], i+1):
-                if movement2.defeated:
-                    continue
-                    
-                # Only check collisions between enemy troops
-                if movement1.owner != movement2.owner:
-                    # Calculate distance between troops
-                    distance = calculate_collision_distance(movement1, movement2)
-                    
-                    # If distance is less than sum of radii, they collide
-                    if distance < movement1.get_radius() + movement2.get_radius():
-                        # Battle!
-                        winner, loser = resolve_troop_battle(movement1, movement2)
-                        
-                        # If there's a loser, add to defeated list
-                        if loser and loser.defeated:
-                            if loser not in defeated:
-                                defeated.append(loser)
-                        
-                        # If both were defeated (tie)
-                        if movement1.defeated and movement2.defeated:
-                            if movement1 not in defeated:
-                                defeated.append(movement1)
-                            if movement2 not in defeated:
-                                defeated.append(movement2)
-        
-        # Process troops that have arrived at their destinations
-        for movement in completed:
-            if not movement.defeated:  # Only process troops that weren't defeated
-                target_base = self.get_base(movement.target_x, movement.target_y)
-                if target_base:
-                    # Process troop arrival at the target base
-                    target_base.process_troop_arrival(movement.owner, movement.units)
-        
-        # Remove completed and defeated movements
-        for movement in completed + defeated:
-            if movement in self.troop_movements:
-                self.troop_movements.remove(movement)
+    def update_troop_movements(self, current_time: float = None):
+        """Snapshot troop positions and process the arrivals and battles that are due"""
+        if current_time is None:
+            current_time = self.clock.now()
+        self.troop_store.snapshot_positions(current_time)
+        
+        # Events come out in time order; a battle can schedule follow-up battles
+        # for the winner, which are picked up by the same loop if already due
+        for event_time, event in self.troop_events.pop_due(current_time):
+            if event[0] == "arrival":
+                self.process_arrival(event[1])
+            else:
+                self.process_battle(event_time, *event[1:])
+    
+    def process_arrival(self, row: int):
+        """Hand an arriving troop store row's units to its target base."""
+        store = self.troop_store
+        slot = store.slot[row]
+        if slot < 0:
+            return  # Defeated on the way
+        target_x, target_y = store.paths[store.path_id[row]][-1]
+        target_base = self.get_base(target_x, target_y)
+        if target_base:
+            target_base.process_troop_arrival(PLAYERS[store.owner[row]], store.units[row])
+        self.remove_troop_movement(self.troop_movements[slot])
+    
+    def process_battle(self, event_time: float, row1: int, row2: int, version1: int, version2: int):
+        """Fight a predicted battle unless either side has since been removed or changed size."""
+        store = self.troop_store
+        if store.slot[row1] < 0 or store.slot[row2] < 0:
+            return
+        if store.version[row1] != version1 or store.version[row2] != version2:
+            return  # Stale prediction; a newer one was scheduled when the units changed
+        
+        movement1 = self.troop_movements[store.slot[row1]]
+        movement2 = self.troop_movements[store.slot[row2]]
+        resolve_troop_battle(movement1, movement2)
+        for movement in (movement1, movement2):
+            if movement.defeated:
+                self.remove_troop_movement(movement)
+            else:
+                # The survivor shrank, so its radius and future contacts changed
+                store.version[movement.row] += 1
+                self.schedule_battles(movement.row, event_time)
+
+    def snapshot(self) -> "GameSnapshot":
+        """What players see of the current tick; taken once per tick and shared by all views."""
+        if self.last_snapshot is None or self.last_snapshot.turn != self.turn:
+            self.last_snapshot = GameSnapshot(self)
+        return self.last_snapshot
+    
+    def queue_move(self, source_x: int, source_y: int, target_x: int, target_y: int, units: int, player: Player, custom_route: List[Tuple[int, int]] = None):
+        """Queue a move for the next update; safe to call from strategy threads."""
+        self.pending_commands.append((player.value, self.make_move,
+                                      (source_x, source_y, target_x, target_y, units, player, custom_route)))
+    
+    def queue_multi_move(self, player: Player, moves_list):
+        """Queue a make_multi_move batch of one player for the next update."""
+        self.pending_commands.append((player.value, self.make_multi_move, (moves_list,)))
+    
+    def apply_pending_commands(self):
+        """Apply every queued command, player 1's before player 2's, each in arrival order.
+        
+        A command that raises, like a move with non-numeric fields from a
+        player's reply, is reported and dropped; it must not stop the game.
+        """
+        commands = []
+        while self.pending_commands:
+            commands.append(self.pending_commands.popleft())
+        # Stable sort: the order threads happened to finish in doesn't matter
+        commands.sort(key=lambda command: command[0])
+        for player_value, method, args in commands:
+            try:
+                method(*args)
+            except Exception as e:
+                print(f"Dropped invalid command from {PLAYERS[player_value]}: {e}")
 
     def make_multi_move(self, moves_list):
         """Process multiple moves at once
@@ -660,36 +1222,24 @@ class GameState:
 
     def is_game_over(self) -> Optional[Player]:
         """Check if the game is over and return the winner if any"""
-        player1_bases = self.get_player_bases(Player.PLAYER1)
-        player2_bases = self.get_player_bases(Player.PLAYER2)
-
-        player1_troops_in_transit = sum(movement.units for movement in self.troop_movements if movement.owner == Player.PLAYER1)
-        player2_troops_in_transit = sum(movement.units for movement in self.troop_movements if movement.owner == Player.PLAYER2)
-        
-        if not player1_bases and not player1_troops_in_transit:
+        if not self.get_player_base_count(Player.PLAYER1) and not self.get_player_transit_units(Player.PLAYER1):
             return Player.PLAYER2
-        if not player2_bases and not player2_troops_in_transit:
+        if not self.get_player_base_count(Player.PLAYER2) and not self.get_player_transit_units(Player.PLAYER2):
             return Player.PLAYER1
         
         # Check if the maximum duration has been reached
-        if time.time() - self.start_time >= self.max_duration:
+        if self.clock.now() - self.start_time >= self.max_duration:
             return self.determine_winner_by_units()
         
         return None
 
     def determine_winner_by_units(self) -> Player:
         """Determine the winner based on the total number of units"""
-        player1_units = sum(base.units for base in self.get_player_bases(Player.PLAYER1))
-        player2_units = sum(base.units for base in self.get_player_bases(Player.PLAYER2))
-
-        player1_units = 0 if player1_units == None else player1_units
-        player2_units = 0 if player2_units == None else player2_units
+        player1_units = self.get_player_base_units(Player.PLAYER1)
+        player2_units = self.get_player_base_units(Player.PLAYER2)
 
-        player1_troops_in_transit = sum(movement.units for movement in self.troop_movements if movement.owner == Player.PLAYER1)
-        player2_troops_in_transit = sum(movement.units for movement in self.troop_movements if movement.owner == Player.PLAYER2)
-
-        player1_troops_in_transit = 0 if player1_troops_in_transit == None else player1_troops_in_transit
-        player2_troops_in_transit = 0 if player2_troops_in_transit == None else player2_troops_in_transit
+        player1_troops_in_transit = self.get_player_transit_units(Player.PLAYER1)
+        player2_troops_in_transit = self.get_player_transit_units(Player.PLAYER2)
         
         if player1_units + player1_troops_in_transit > player2_units + player2_troops_in_transit:
             return Player.PLAYER1
@@ -699,11 +1249,52 @@ class GameState:
             # If tied, return NEUTRAL to indicate a draw
             return Player.NEUTRAL
 
-def calculate_collision_distance(movement1, movement2):
-    """Calculate the distance between two troop movements"""
-    x1, y1, _ = movement1.get_position()
-    x2, y2, _ = movement2.get_position()
-    return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+def predict_contact_time(store: TroopStore, row1: int, row2: int, from_time: float) -> Optional[float]:
+    """First time at or after from_time when two troop store rows are closer than their combined radii.
+    
+    Both troops move along piecewise-linear paths at constant speed, so between
+    consecutive path corners their separation changes linearly and the contact
+    time is the smaller root of a quadratic. Returns None if they never touch
+    while both are in flight.
+    """
+    start = max(from_time, store.start_time[row1], store.start_time[row2])
+    end = min(store.arrival_time(row1), store.arrival_time(row2))
+    if end < start:
+        return None
+    
+    reach = store.radius(row1) + store.radius(row2)
+    corners = {t for t in store.segment_times(row1) + store.segment_times(row2) if start < t < end}
+    times = [start] + sorted(corners) + ([end] if end > start else [])
+    
+    position_at = store.position_at
+    x1, y1, _ = position_at(row1, start)
+    x2, y2, _ = position_at(row2, start)
+    dx, dy = x2 - x1, y2 - y1
+    if dx * dx + dy * dy < reach * reach:
+        return start
+    
+    for t0, t1 in zip(times, times[1:]):
+        x1, y1, _ = position_at(row1, t1)
+        x2, y2, _ = position_at(row2, t1)
+        next_dx, next_dy = x2 - x1, y2 - y1
+        
+        # Relative position d(t) = d0 + v * (t - t0); solve |d(t)| = reach
+        span = t1 - t0
+        vx, vy = (next_dx - dx) / span, (next_dy - dy) / span
+        a = vx * vx + vy * vy
+        c = dx * dx + dy * dy - reach * reach
+        if c < 0:
+            return t0
+        if a > 0:
+            b = 2 * (dx * vx + dy * vy)
+            discriminant = b * b - 4 * a * c
+            if discriminant > 0:
+                tau = (-b - math.sqrt(discriminant)) / (2 * a)
+                if 0 <= tau <= span:
+                    return t0 + tau
+        dx, dy = next_dx, next_dy
+    
+    return None
 
 def resolve_troop_battle(movement1, movement2):
     """Resolve a battle between two troop movements and return the winner"""
@@ -994,6 +1585,13 @@ def draw_special_base(screen, x, y, radius, owner, unit_count, font, cooldown=0)
         cooldown_overlay.fill((0, 0, 0, 150))
         screen.blit(cooldown_overlay, cooldown_rect.topleft)
 
+BASE_DRAWERS = {  # Indexed by base type code
+    BASE_TYPE_BASE: draw_mushroom,
+    BASE_TYPE_SPECIAL: draw_special_base,
+    BASE_TYPE_SPEEDY: draw_speedy_base,
+    BASE_TYPE_FORTIFIED: draw_fortified_base,
+}
+
 def are_troops_overlapping(movement1, movement2, threshold=20):
     """Check if two troop movements are overlapping or very close to each other."""
     x1, y1, _ = movement1.get_position()
@@ -1143,16 +1741,10 @@ def draw_game(screen, state: GameState):
     for base in state.bases:
         pos_x = base.x * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
         pos_y = base.y * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2
-        cooldown = max(0, state.base_cooldowns.get((base.x, base.y), 0) - time.time())
-
-        if isinstance(base, SpecialBase):
-            draw_special_base(screen, pos_x, pos_y, CELL_SIZE // 2 - 2, base.owner, base.units, main_font, cooldown)
-        elif isinstance(base, SpeedyBase):
-            draw_speedy_base(screen, pos_x, pos_y, CELL_SIZE // 2 - 2, base.owner, base.units, main_font, cooldown)
-        elif isinstance(base, FortifiedBase):
-            draw_fortified_base(screen, pos_x, pos_y, CELL_SIZE // 2 - 2, base.owner, base.units, main_font, cooldown)
-        else:
-            draw_mushroom(screen, pos_x, pos_y, CELL_SIZE // 2 - 2, base.owner, base.units, main_font, cooldown)
+        cooldown = max(0, state.base_cooldowns.get((base.x, base.y), 0) - state.clock.now())
+
+        draw_base = BASE_DRAWERS[base.type_code]
+        draw_base(screen, pos_x, pos_y, CELL_SIZE // 2 - 2, base.owner, base.units, main_font, cooldown)
     
     # Draw game information
     info_y = state.size * (CELL_SIZE + MARGIN) + 10
@@ -1162,7 +1754,7 @@ def draw_game(screen, state: GameState):
     screen.blit(info_surface, (0, info_y))
     
     # Draw game time
-    game_time = int(time.time() - state.start_time)
+    game_time = int(state.clock.now() - state.start_time)
     time_text = main_font.render(f"Time: {game_time}s", True, COLORS["text"])
     screen.blit(time_text, (10, info_y + 10))
     
@@ -1171,14 +1763,21 @@ def draw_game(screen, state: GameState):
     screen.blit(troop_text, (200, info_y + 10))
     
     # Draw unit counts with correct color labels
-    p1_bases = state.get_player_bases(Player.PLAYER1)
-    p2_bases = state.get_player_bases(Player.PLAYER2)
-    p1_units = sum(base.units for base in p1_bases)
-    p2_units = sum(base.units for base in p2_bases)
+    p1_units = state.get_player_base_units(Player.PLAYER1)
+    p2_units = state.get_player_base_units(Player.PLAYER2)
     
     units_text = main_font.render(f"Red: {p1_units} units | Blue: {p2_units} units", True, COLORS["text"])
     screen.blit(units_text, (10, info_y + 30))
 
+def announce_winner(winner, player1_config=None, player2_config=None):
+    """Print the match result: the winning player's file, or a draw."""
+    if winner == Player.NEUTRAL:
+        print("It's a Draw!")
+    elif winner == Player.PLAYER1:
+        print(player1_config[1] if player1_config else "Player 1")
+    else:
+        print(player2_config[1] if player2_config else "Player 2")
+
 def show_game_over(screen, winner, time_up=False, player1_config=None, player2_config=None):
     """Display a game over message"""
     # Use custom font for game over screen
@@ -1188,15 +1787,11 @@ def show_game_over(screen, winner, time_up=False, player1_config=None, player2_c
     else:
         time_up_text = "Game Over!"
     
+    announce_winner(winner, player1_config, player2_config)
     if winner == Player.NEUTRAL:
         winner_text = "It's a Draw!"
         winner_color = COLORS["neutral"]
-        print("It's a Draw!")
     else:
-        if winner == Player.PLAYER1:
-            print(player1_config[1])
-        else:
-            print(player2_config[1])
         winner_text = "Player 1 (Red)" if winner == Player.PLAYER1 else "Player 2 (Blue)"
         winner_color = COLORS["player1"] if winner == Player.PLAYER1 else COLORS["player2"]
 
@@ -1223,12 +1818,88 @@ def show_game_over(screen, winner, time_up=False, player1_config=None, player2_c
     time.sleep(3)
     pygame.quit()
 
+class GameSnapshot:
+    """What every player sees of the game at one tick, taken once and shared by all views.
+    
+    Bases are (x, y, owner, units, growth_rate, type code) and movements are
+    (id, source_x, source_y, owner, units, current_x, current_y, progress,
+    start_time, duration, path), in grid coordinates and game time.
+    Encoders keep the player-independent part of their encoding in encoded,
+    so it is produced once per tick however many players get it.
+    """
+    def __init__(self, game_state: GameState):
+        self.turn = game_state.turn
+        self.size = game_state.size
+        self.max_duration = game_state.max_duration
+        self.game_time = game_state.last_update_time - game_state.start_time  # Instant of the position snapshot
+        self.bases = tuple((base.x, base.y, base.owner.value, base.units, base.growth_rate, base.type_code)
+                           for base in game_state.bases)
+        self.base_store = game_state.base_store  # Caches the bases' JSON objects across ticks
+        movements = []
+        for movement in game_state.troop_movements:
+            if movement.defeated:
+                continue
+            # Convert from screen coordinates back to grid coordinates
+            current_x, current_y, progress = movement.get_position()
+            movements.append((movement.row, movement.source_x, movement.source_y, movement.owner.value,
+                              movement.units, current_x / (CELL_SIZE + MARGIN), current_y / (CELL_SIZE + MARGIN),
+                              progress, movement.start_time - game_state.start_time, movement.duration,
+                              movement.path))
+        self.movements = tuple(movements)
+        self.encoded = {}  # Encoder name -> shared encoding of this snapshot
+    
+    def to_json(self, player: int) -> dict:
+        """The JSON-serializable state for one player, built fresh so strategies may modify it."""
+        return {
+            "player": player,
+            "size": self.size,
+            "bases": [{"x": x, "y": y, "owner": owner, "units": units, "growth_rate": growth_rate,
+                       "type": BASE_TYPE_NAMES[type_code]}
+                      for x, y, owner, units, growth_rate, type_code in self.bases],
+            "movements": self.movement_dicts(),
+            "game_time": self.game_time,
+            "game_max_duration": self.max_duration,
+        }
+    
+    def movement_dicts(self) -> list:
+        return [{"source_x": source_x, "source_y": source_y, "units": units, "owner": owner,
+                 "current_x": current_x, "current_y": current_y, "progress": progress}
+                for _, source_x, source_y, owner, units, current_x, current_y, progress, _, _, _ in self.movements]
+    
+    def json_line(self, player: int, version: int) -> bytes:
+        """The state message for one player; everything after the player and version fields is serialized once.
+        
+        Bases are joined from fragments the BaseStore caches, so only bases
+        that changed since they were last sent are encoded again.
+        """
+        body = self.encoded.get("json")
+        if body is None:
+            # Bases are the store's rows, in order
+            fragments = [self.base_store.json_fragment(index, record) for index, record in enumerate(self.bases)]
+            body = self.encoded["json"] = b"".join((
+                b'"size": %d, "bases": [' % self.size,
+                b", ".join(fragments),
+                b'], "movements": ', json.dumps(self.movement_dicts()).encode(),
+                b', "game_time": ', json.dumps(self.game_time).encode(),
+                b', "game_max_duration": ', json.dumps(self.max_duration).encode(),
+                b"}",
+            ))
+        return b'{"player": %d, "version": %d, ' % (player, version) + body + b"\n"
+
 class PlayerViewState:
     """A restricted view of the game state for player strategies."""
-    def __init__(self, game_state: GameState, player: Player):
+    def __init__(self, game_state: GameState, player: Player, snapshot: GameSnapshot = None):
         self._game_state = game_state
         self._player = player
+        self._snapshot = snapshot
         self._move_executed = False  # Track if player has made a move this turn
+    
+    @property
+    def snapshot(self) -> GameSnapshot:
+        """The tick this view reports; the game state's current one unless given"""
+        if self._snapshot is None:
+            self._snapshot = self._game_state.snapshot()
+        return self._snapshot
         
     def get_player_bases(self, player: Player) -> List[Base]:
         """Get a list of bases owned by a player."""
@@ -1252,18 +1923,17 @@ class PlayerViewState:
                 if not movement.defeated]
     
     def make_move(self, source_x: int, source_y: int, target_x: int, target_y: int, units: int, custom_route: List = None):
-        """Make a move as this player."""
+        """Make a move as this player; it is applied at the start of the next game update."""
         if self._move_executed:
             print(f"Player {self._player} attempted multiple moves in one turn!")
             return False  # Prevent multiple moves in one turn
         
-        result = self._game_state.make_move(source_x, source_y, target_x, target_y, units, self._player, custom_route)
-        if result:
-            self._move_executed = True
-        return result
+        self._game_state.queue_move(source_x, source_y, target_x, target_y, units, self._player, custom_route)
+        self._move_executed = True
+        return True
     
     def make_multi_move(self, moves_list):
-        """Make multiple moves as this player."""
+        """Make multiple moves as this player; applied with the next game update."""
         if self._move_executed:
             print(f"Player {self._player} attempted multiple multi_moves in one turn!")
             return False  # Prevent multiple moves in one turn
@@ -1276,191 +1946,778 @@ class PlayerViewState:
                 elif isinstance(move, list) and len(move) == 6:
                     player_moves.append((move[0], move[1], move[2], move[3], move[4], self._player, move[5]))
             
-        result = self._game_state.make_multi_move(player_moves)
-        if result:
-            self._move_executed = True
-        return result
+        if not player_moves:
+            return False
+        self._game_state.queue_multi_move(self._player, player_moves)
+        self._move_executed = True
+        return True
     
     def to_json(self):
         """Convert the player view state to a JSON-serializable dictionary."""
-        bases = []
-        for base in self._game_state.bases:
-            base_type = "Base"
-            if isinstance(base, SpecialBase):
-                base_type = "SpecialBase"
-            elif isinstance(base, SpeedyBase):
-                base_type = "SpeedyBase"
-            elif isinstance(base, FortifiedBase):
-                base_type = "FortifiedBase"
-                
-            bases.append({
-                "x": base.x,
-                "y": base.y,
-                "owner": base.owner.value,
-                "units": base.units,
-                "growth_rate": base.growth_rate,
-                "type": base_type
-            })
-            
-        movements = []
-        for movement in self.get_troop_movements():
-            # Get the current position of the troop movement
-            current_x, current_y, progress = movement.get_position()
-            
-            # Convert from screen coordinates back to grid coordinates
-            grid_x = current_x / (CELL_SIZE + MARGIN)
-            grid_y = current_y / (CELL_SIZE + MARGIN)
-            
-            movements.append({
-                "source_x": movement.source_x,
-                "source_y": movement.source_y,
-                # "target_x": movement.target_x,
-                # "target_y": movement.target_y,
-                "units": movement.units,
-                "owner": movement.owner.value,
-                "current_x": grid_x, 
-                "current_y": grid_y, 
-                "progress": progress  
-            })
-            
-        return {
-            "player": self._player.value,
-            "size": self._game_state.size,
-            "bases": bases,
-            "movements": movements,
-            "game_time": time.time() - self._game_state.start_time,
-            "game_max_duration": self._game_state.max_duration
+        return self.snapshot.to_json(self._player.value)
+
+class JsonEncoder:
+    """Encodes player states as one full JSON object per line (the default protocol).
+    
+    Besides the fields of PlayerViewState.to_json each line has a "version".
+    """
+    welcome_info = {}  # Extra fields of the welcome the client needs to decode
+    
+    def __init__(self):
+        self.version = 0  # Of the last state sent
+    
+    def encode(self, player_view: PlayerViewState) -> bytes:
+        self.version += 1
+        return player_view.snapshot.json_line(player_view._player.value, self.version)
+    
+    def ack(self, version):
+        if type(version) is not int:
+            return  # Not an ack we ever asked for; ignored like DeltaEncoder does
+        # Every message is complete; nothing to track
+    
+    def close(self):
+        pass
+
+class DeltaEncoder:
+    """Encodes player states as changes since the last state the client acknowledged.
+    
+    Each line is {"delta": {...}} with a "version" and the "base" version it
+    applies to. With no base it is a keyframe that also carries the static
+    map: "size", "game_max_duration" and "map" ([x, y, type] per base). Then
+    "bases" lists [index, owner, units, growth_rate] of changed bases,
+    "movements" lists new or changed movements as [id, source_x, source_y,
+    units, owner, start_time, duration, path], and "removed" the ids of
+    movements that are gone. Movement times are game times, so the client
+    works out positions itself. A client acknowledges a version by adding
+    "ack": version to its reply.
+    """
+    welcome_info = {}
+    history_limit = 64  # States kept for a client that stops acknowledging
+    
+    def __init__(self):
+        self.version = 0
+        self.acked = None  # Newest version the client has confirmed
+        self.sent = {}  # version -> (base tuples, {movement id: record}) as sent
+    
+    def ack(self, version):
+        """Take version as the base of later deltas; anything but a version we sent is ignored."""
+        if type(version) is not int:
+            return  # Clients control this value; it must not reach the dict and set lookups
+        if version in self.sent and (self.acked is None or version > self.acked):
+            self.acked = version
+            for old_version in [v for v in self.sent if v < version]:
+                del self.sent[old_version]
+    
+    def encode(self, player_view: PlayerViewState) -> bytes:
+        snapshot = player_view.snapshot
+        bases = [(owner, units, growth_rate) for _, _, owner, units, growth_rate, _ in snapshot.bases]
+        movements = {}
+        for movement_id, source_x, source_y, owner, units, _, _, _, start_time, duration, path in snapshot.movements:
+            movements[movement_id] = [movement_id, source_x, source_y, units, owner, start_time, duration, path]
+        
+        self.version += 1
+        message = {
+            "version": self.version,
+            "base": self.acked,
+            "player": player_view._player.value,
+            "game_time": snapshot.game_time,
         }
+        if self.acked is None:
+            message["size"] = snapshot.size
+            message["game_max_duration"] = snapshot.max_duration
+            message["map"] = [[x, y, BASE_TYPE_NAMES[type_code]] for x, y, _, _, _, type_code in snapshot.bases]
+            previous_bases, previous_movements = [None] * len(bases), {}
+        else:
+            previous_bases, previous_movements = self.sent[self.acked]
+        
+        message["bases"] = [[index, *base] for index, base in enumerate(bases) if base != previous_bases[index]]
+        message["movements"] = [record for movement_id, record in movements.items()
+                                if previous_movements.get(movement_id) != record]
+        message["removed"] = [movement_id for movement_id in previous_movements if movement_id not in movements]
+        
+        self.sent[self.version] = (bases, movements)
+        if len(self.sent) > self.history_limit:
+            oldest = min(v for v in self.sent if v != self.acked)
+            del self.sent[oldest]
+        return (json.dumps({"delta": message}) + "\n").encode()
+    
+    def close(self):
+        pass
+
+class BinaryEncoder:
+    """Encodes player states as length-prefixed frames of fixed-layout records.
+    
+    A frame is a little-endian uint32 payload length, then the HEADER and one
+    BASE_RECORD per base and one MOVEMENT_RECORD per movement, with the same
+    values as the JSON state. Type codes index the "base_types" list of the
+    welcome. Only the server-to-client direction is binary; moves stay JSON
+    lines.
+    """
+    welcome_info = {"base_types": list(BASE_TYPE_NAMES)}
+    FRAME_LENGTH = struct.Struct("<I")
+    HEADER = struct.Struct("<BIHddHH")  # player, version, size, game_time, game_max_duration, base count, movement count
+    VERSION = struct.Struct("<I")  # Patched in after the player byte of each header
+    BASE_RECORD = struct.Struct("<HHbdBB")  # x, y, owner, units, growth_rate, type code
+    MOVEMENT_RECORD = struct.Struct("<HHbdddd")  # source_x, source_y, owner, units, current_x, current_y, progress
+    
+    def __init__(self):
+        self.version = 0  # Of the last frame sent
+    
+    def shared_payload(self, snapshot: GameSnapshot) -> bytes:
+        """Header and records of a snapshot, packed once per tick with player and version 0 in the header."""
+        payload = snapshot.encoded.get("binary")
+        if payload is not None:
+            return payload
+        payload = bytearray(self.HEADER.size + len(snapshot.bases) * self.BASE_RECORD.size
+                            + len(snapshot.movements) * self.MOVEMENT_RECORD.size)
+        self.HEADER.pack_into(payload, 0, 0, 0, snapshot.size, snapshot.game_time, snapshot.max_duration,
+                              len(snapshot.bases), len(snapshot.movements))
+        offset = self.HEADER.size
+        for x, y, owner, units, growth_rate, type_code in snapshot.bases:
+            self.BASE_RECORD.pack_into(payload, offset, x, y, owner, units, growth_rate, type_code)
+            offset += self.BASE_RECORD.size
+        for _, source_x, source_y, owner, units, current_x, current_y, progress, _, _, _ in snapshot.movements:
+            self.MOVEMENT_RECORD.pack_into(payload, offset, source_x, source_y, owner, units,
+                                           current_x, current_y, progress)
+            offset += self.MOVEMENT_RECORD.size
+        payload = snapshot.encoded["binary"] = bytes(payload)
+        return payload
+    
+    def encode(self, player_view: PlayerViewState) -> bytearray:
+        payload = self.shared_payload(player_view.snapshot)
+        frame = bytearray(self.FRAME_LENGTH.pack(len(payload)))
+        frame += payload
+        self.version += 1
+        frame[self.FRAME_LENGTH.size] = player_view._player.value  # First field of the header
+        self.VERSION.pack_into(frame, self.FRAME_LENGTH.size + 1, self.version)
+        return frame
+    
+    def ack(self, version):
+        if type(version) is not int:
+            return  # Not an ack we ever asked for; ignored like DeltaEncoder does
+        # Every frame is complete; nothing to track
+    
+    def close(self):
+        pass
+
+class SharedMemoryEncoder(BinaryEncoder):
+    """Publishes player states in a shared memory segment guarded by a seqlock.
+    
+    The segment holds a uint64 SEQUENCE, odd while a write is in progress,
+    then the uint32 payload length and a BinaryEncoder payload. Over the
+    socket each state is only announced with {"shm": sequence}; "shm_name"
+    is added when the segment had to be replaced by a bigger one. A reader
+    copies nothing: it reads the sequence, the records, and the sequence
+    again, and retries if it changed. Moves still come back over the socket.
+    """
+    SEQUENCE = struct.Struct("<Q")
+    PAYLOAD_START = SEQUENCE.size + BinaryEncoder.FRAME_LENGTH.size
+    
+    def __init__(self, size=1 << 16):
+        super().__init__()
+        self.segment = shared_memory.SharedMemory(create=True, size=size)
+        self.sequence = 0
+        self.welcome_info = {"base_types": list(BASE_TYPE_NAMES), "shm_name": self.segment.name}
+    
+    def encode(self, player_view: PlayerViewState) -> bytes:
+        payload = self.shared_payload(player_view.snapshot)
+        payload_size = len(payload)
+        
+        notice = {}
+        if self.PAYLOAD_START + payload_size > self.segment.size:
+            # Readers keep their mapping of the old segment until they switch
+            size = self.segment.size
+            while self.PAYLOAD_START + payload_size > size:
+                size *= 2
+            self.close()
+            self.segment = shared_memory.SharedMemory(create=True, size=size)
+            notice["shm_name"] = self.segment.name
+        
+        buffer = self.segment.buf
+        self.sequence += 1  # Odd: readers retry until the write is done
+        self.SEQUENCE.pack_into(buffer, 0, self.sequence)
+        self.FRAME_LENGTH.pack_into(buffer, self.SEQUENCE.size, payload_size)
+        buffer[self.PAYLOAD_START:self.PAYLOAD_START + payload_size] = payload
+        self.version += 1
+        buffer[self.PAYLOAD_START] = player_view._player.value
+        self.VERSION.pack_into(buffer, self.PAYLOAD_START + 1, self.version)
+        self.sequence += 1
+        self.SEQUENCE.pack_into(buffer, 0, self.sequence)
+        
+        notice["shm"] = self.sequence
+        return (json.dumps(notice) + "\n").encode()
+    
+    def close(self):
+        self.segment.close()
+        self.segment.unlink()
+
+# Encoders a client can choose with {"hello": {"player_id": ..., "protocol": name}}
+PROTOCOL_ENCODERS = {
+    "json": JsonEncoder,
+    "delta": DeltaEncoder,
+    "binary": BinaryEncoder,
+    "shm": SharedMemoryEncoder,
+}
+
+def is_stale_reply(message, encoder) -> bool:
+    """Whether a reply answers an older state than the last one encoder sent.
+    
+    Every protocol numbers its states with a "version", and a reply that
+    echoes it as "ack" says which state it answers. Replies without one
+    can't be placed and are taken as answering the last state.
+    """
+    ack = message.get("ack") if isinstance(message, dict) else None
+    return type(ack) is int and ack != encoder.version
+
+def is_socket_player(language, player_file) -> bool:
+    """Whether a player config runs as a separate process that connects over a socket.
+    
+    Python files only do if they are named socket_*.py; others are imported
+    as strategy functions, and "inprocess" players run in this process.
+    """
+    if language.lower() == "inprocess":
+        return False
+    if language.lower() == "python":
+        return os.path.basename(player_file).startswith("socket_") and player_file.endswith(".py")
+    return True
+
+def player_command(language, player_file, port, player_id, player_num) -> Optional[List[str]]:
+    """Command line that starts a socket player pointed at port, or None for an unsupported language."""
+    if language.lower() == "python":
+        return ["python", player_file, str(port), player_id, str(player_num)]
+    if language.lower() == "java":
+        class_name = os.path.basename(player_file).split('.')[0]
+        return ["java", "-cp", os.path.dirname(player_file), class_name, str(port), player_id, str(player_num)]
+    if language.lower() == "cpp":
+        executable = os.path.splitext(player_file)[0]
+        return [executable, str(port), player_id, str(player_num)]
+    return None
+
+class FrameReader:
+    """Reads newline-delimited frames from a socket through one reusable buffer.
+    
+    Bytes after a frame's newline stay buffered for the next call, and no
+    recv is made while a complete frame is already waiting.
+    """
+    def __init__(self, sock, buffer_size=65536):
+        self.sock = sock
+        self.buffer = bytearray(buffer_size)
+        self.start = 0  # First byte not yet returned in a frame
+        self.end = 0  # End of the bytes received so far
+    
+    def has_frame(self) -> bool:
+        return self.buffer.find(b"\n", self.start, self.end) != -1
+    
+    def fill(self) -> int:
+        """Receive once into the free end of the buffer; returns 0 once the peer has closed."""
+        if self.end == len(self.buffer):
+            if self.start:
+                # Move the partial frame to the front to reuse the consumed space
+                self.buffer[:self.end - self.start] = self.buffer[self.start:self.end]
+                self.end -= self.start
+                self.start = 0
+            else:
+                self.buffer.extend(bytes(len(self.buffer)))  # One frame fills the buffer
+        with memoryview(self.buffer) as view:
+            received = self.sock.recv_into(view[self.end:])
+        self.end += received
+        return received
+    
+    def next_frame(self) -> Optional[str]:
+        """Pop the next complete frame without touching the socket, or None."""
+        newline = self.buffer.find(b"\n", self.start, self.end)
+        if newline == -1:
+            return None
+        with memoryview(self.buffer) as view:
+            frame = str(view[self.start:newline], "utf-8", "replace")  # Bad bytes then fail as bad JSON
+        self.start = newline + 1
+        if self.start == self.end:
+            self.start = self.end = 0
+        return frame
+    
+    def frames(self):
+        """Yield every complete frame that is already buffered."""
+        frame = self.next_frame()
+        while frame is not None:
+            yield frame
+            frame = self.next_frame()
+    
+    def read_frame(self) -> Optional[str]:
+        """Block until a frame is complete; None if the peer closes first."""
+        frame = self.next_frame()
+        while frame is None:
+            if not self.fill():
+                return None
+            frame = self.next_frame()
+        return frame
+
+class ZygoteChild:
+    """A bot forked by a BotZygote, with the part of the Popen interface the servers use."""
+    def __init__(self, zygote, pid):
+        self.zygote = zygote
+        self.pid = pid
+        self.returncode = None  # Set by kill; exits are only known to the zygote, which reaps the bot
+    
+    def kill(self):
+        """Kill the bot if it is still running.
+        
+        The zygote does the checking and the signalling: only it knows whether
+        the pid is still its unreaped child, and so not possibly reused.
+        Blocks on the zygote's control socket.
+        """
+        if self.returncode is not None:
+            return
+        try:
+            self.zygote.kill(self.pid)
+        except OSError:
+            pass  # The zygote is gone, and with it any safe way to signal the pid
+        self.returncode = -signal.SIGKILL
+
+class BotZygote:
+    """A fork server that has already imported one Python bot file.
+    
+    Each spawn forks a child that runs the bot as `python player_file args`
+    would, so only the first match pays for interpreter start-up and the
+    bot's imports. Every child starts from the same freshly imported state,
+    so nothing carries over between matches. Requests go over a Unix
+    socketpair, one at a time, which also passes the socketpair end a child
+    should inherit. POSIX only.
+    """
+    def __init__(self, player_file):
+        self.player_file = player_file
+        self.control, zygote_end = socket.socketpair()
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--zygote", player_file, str(zygote_end.fileno())],
+                pass_fds=(zygote_end.fileno(),))
+        finally:
+            zygote_end.close()
+        self.replies = self.control.makefile("rb")
+        self.lock = threading.Lock()  # One request and its reply at a time
+    
+    def request(self, message, fds=()) -> int:
+        with self.lock:
+            socket.send_fds(self.control, [json.dumps(message).encode()], list(fds))
+            reply = self.replies.readline()
+        if not reply:
+            raise OSError(f"Zygote for {self.player_file} exited")
+        return int(reply)
+    
+    def spawn(self, args, inherit=None) -> ZygoteChild:
+        """Fork a bot with args after its file name; inherit is a socket it gets as RTS_SOCKET_FD."""
+        return ZygoteChild(self, self.request({"args": args}, [inherit.fileno()] if inherit else []))
+    
+    def kill(self, pid) -> bool:
+        """SIGKILL a bot this zygote forked if it is still running; True if it was."""
+        return bool(self.request({"kill": pid}))
+    
+    def close(self):
+        """Stop the zygote; bots it already forked keep running."""
+        self.replies.close()
+        self.control.close()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+def run_zygote(player_file, control_fd):
+    """Body of a BotZygote process: import player_file once, then fork or kill a bot per request."""
+    control = socket.socket(fileno=control_fd)
+    children = set()  # Forked bots not reaped yet; their pids cannot have been reused
+    
+    def reap(signum, frame):
+        while children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            children.discard(pid)
+    
+    signal.signal(signal.SIGCHLD, reap)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(player_file)))  # As `python player_file` would
+    runpy.run_path(player_file, run_name="zygote")  # Runs the imports and definitions, but not main
+    while True:
+        try:
+            request, fds, _, _ = socket.recv_fds(control, 65536, 1)
+        except OSError:
+            break
+        if not request:
+            break  # The server closed the zygote
+        request = json.loads(request)
+        # No reaping while children is consulted, so a pid is still ours when we signal it
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGCHLD})
+        try:
+            if "kill" in request:
+                alive = request["kill"] in children
+                if alive:
+                    os.kill(request["kill"], signal.SIGKILL)
+                reply = int(alive)
+            else:
+                # Output buffered from the bot's imports would otherwise be written by both processes
+                sys.stdout.flush()
+                sys.stderr.flush()
+                reply = os.fork()
+                if reply == 0:
+                    run_forked_bot(player_file, request["args"], fds, control)
+                children.add(reply)
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+        for fd in fds:
+            os.close(fd)
+        control.sendall(b"%d\n" % reply)
+
+def run_forked_bot(player_file, args, fds, control):
+    """Body of a bot forked by run_zygote: run player_file as __main__ and exit."""
+    control.close()
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+    if fds:
+        os.environ["RTS_SOCKET_FD"] = str(fds[0])
+    sys.argv = [player_file] + args
+    exit_code = 0
+    try:
+        runpy.run_path(player_file, run_name="__main__")
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(exit_code)
+
+class ZygotePool:
+    """BotZygotes by bot file, started on first use and kept for the matches that follow.
+    
+    Pass one to run_game or run_matches to start Python socket players by
+    forking instead of running a new interpreter per match.
+    """
+    def __init__(self):
+        self.zygotes = {}
+        self.lock = threading.Lock()  # Spawns may come from executor threads
+    
+    def spawn(self, player_file, args, inherit=None) -> ZygoteChild:
+        key = os.path.abspath(player_file)
+        with self.lock:
+            if key not in self.zygotes:
+                self.zygotes[key] = BotZygote(player_file)
+            zygote = self.zygotes[key]
+        return zygote.spawn(args, inherit)
+    
+    def close(self):
+        for zygote in self.zygotes.values():
+            zygote.close()
+        self.zygotes.clear()
+
+def load_bot_class(player_file):
+    """The GameClient-style class of a socket player file, or None.
+    
+    That is GameClient if it has a make_move method, or else the first class
+    defined in the file that has one. The file is imported, not run as
+    __main__, so it does not connect anywhere.
+    """
+    spec = importlib.util.spec_from_file_location(f"inprocess_{uuid4().hex}", player_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    candidates = [getattr(module, "GameClient", None)] + [
+        value for value in vars(module).values()
+        if isinstance(value, type) and value.__module__ == module.__name__]
+    for candidate in candidates:
+        if isinstance(candidate, type) and callable(getattr(candidate, "make_move", None)):
+            return candidate
+    return None
+
+class InProcessPlayer:
+    """Strategy that calls a socket player's make_move(state) directly, with no socket in between.
+    
+    The bot gets the same JSON state a socket player parses off the wire
+    and returns the same {"move": ...} or {"moves": [...]} reply. Without a
+    time_budget make_move runs on the caller's thread. With one it runs on
+    the player's daemon worker thread, started on the first decision: a
+    reply later than time_budget seconds is dropped, and turns that come
+    while make_move is still busy are skipped, like late replies from a
+    socket player. The thread is a daemon so a bot stuck in make_move
+    can't keep the process from exiting.
+    """
+    def __init__(self, bot, player_num, time_budget=None):
+        self.bot = bot
+        self.player_num = player_num
+        self.time_budget = time_budget
+        self.requests = None  # Queue of (state, future) for the worker thread
+        self.pending = None  # Future of the make_move the worker thread was last given
+    
+    def __call__(self, state, player):
+        if self.time_budget is None:
+            return self.bot.make_move(state)
+        if self.pending is not None and not self.pending.done():
+            # Never queue a second state; it would only be answered after it is stale
+            print(f"In-process player {self.player_num} is still deciding; skipped a turn")
+            return None
+        if self.requests is None:
+            self.requests = queue.Queue()
+            threading.Thread(target=self.work, daemon=True).start()
+        self.pending = concurrent.futures.Future()
+        self.requests.put((state, self.pending))
+        try:
+            return self.pending.result(timeout=self.time_budget)
+        except concurrent.futures.TimeoutError:
+            print(f"In-process player {self.player_num} missed its {self.time_budget}s budget")
+            return None
+    
+    def work(self):
+        """Body of the worker thread: run make_move for each state it is given, one at a time."""
+        while True:
+            state, future = self.requests.get()
+            try:
+                future.set_result(self.bot.make_move(state))
+            except BaseException as e:
+                future.set_exception(e)
+
+class PlayerLaunch:
+    """A started player process that has not connected yet, with the sockets it may connect on."""
+    def __init__(self, player_id, player_num, process, listener, server_end=None):
+        self.player_id = player_id
+        self.player_num = player_num
+        self.process = process
+        self.listener = listener  # Listening socket on the port the player was given
+        self.server_end = server_end  # Our end of its socketpair, if it was offered one
+    
+    def sockets(self):
+        return [self.listener] + ([self.server_end] if self.server_end else [])
+    
+    def accept(self, ready):
+        """The player's connection, once one of its sockets is ready; the others are closed.
+        
+        A player on the socketpair shows itself by saying hello, which stays
+        unread for the handshake.
+        """
+        if ready is self.server_end:
+            client_socket = ready
+        else:
+            client_socket, _ = self.listener.accept()
+            if self.server_end:
+                self.server_end.close()
+        self.listener.close()
+        return client_socket
+    
+    def abandon(self):
+        """Kill a player that never connected."""
+        self.process.kill()
+        for sock in self.sockets():
+            sock.close()
 
 class LanguageServer:
     """Server to communicate with external language players."""
-    def __init__(self, host='localhost', port=0):
+    def __init__(self, host='localhost', transport="tcp", zygotes=None, time_budget=None):
         self.host = host
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.bind((host, port))
-        self.server_socket.listen(5)
-        self.port = self.server_socket.getsockname()[1]
+        self.transport = transport  # "tcp", or "socketpair" to also offer each player an inherited socket
+        self.zygotes = zygotes  # ZygotePool to fork Python players from, or None to run each one fresh
+        self.time_budget = time_budget  # Seconds an in-process player gets per decision, or None
         self.connections = {}
-        print(f"Language server started on port {self.port}")
+        self.pending_requests = {}  # player_id -> wall-clock deadline of the state awaiting a reply
+        self.readers = {}  # player_id -> FrameReader of the connection
+        self.encoders = {}  # player_id -> encoder of the protocol agreed in the handshake
         
     def start_player_process(self, language, player_file, player_num):
-        """Start a player process in the specified language."""
+        """Start a player process in the specified language and wait for it to connect."""
+        return self.connect_players([self.launch_player(language, player_file, player_num)])[0]
+    
+    def launch_player(self, language, player_file, player_num):
+        """Start a player without waiting for it to connect.
+        
+        Returns a PlayerLaunch to hand to connect_players, a strategy function
+        for Python files that are imported rather than run, or None. The
+        "inprocess" language runs a socket player file's bot class in this
+        process (see InProcessPlayer).
+        """
         player_id = str(uuid4())
         
+        if language.lower() == "inprocess":
+            return self.load_inprocess_player(player_file, player_num)
         if language.lower() == "python":
-            # Check if the file has a .py extension but starts with "socket_"
-            if os.path.basename(player_file).startswith("socket_") and player_file.endswith(".py"):
-                # Handle as socket-based Python player
-                cmd = ["python", player_file, str(self.port), player_id, str(player_num)]
-                try:
-                    process = subprocess.Popen(cmd)
-                    print(f"Started socket-based Python player {player_num} with ID {player_id}")
-                    
-                    # Wait for the player to connect
-                    self.server_socket.settimeout(5)
-                    try:
-                        client_socket, _ = self.server_socket.accept()
-                        client_socket.settimeout(None)
-                        self.connections[player_id] = client_socket
-                        print(f"Player {player_id} connected")
-                        return player_id
-                    except socket.timeout:
-                        print(f"Timeout waiting for player {player_id} to connect")
-                        process.kill()
-                        return None
-                except Exception as e:
-                    print(f"Error starting python socket player process: {e}")
-                    return None
-            else:
-                # For regular Python imports
-                try:
-                    spec = importlib.util.spec_from_file_location("player_module", player_file)
-                    if not spec:
-                        print(f"Error: Could not load Python file {player_file}")
-                        return None
-                        
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    
-                    # Try multiple function name conventions
-                    play_func = None
-                    possible_names = ["play", f"player{player_num}", "make_move", "strategy"]
-                    
-                    for name in possible_names:
-                        play_func = getattr(module, name, None)
-                        if play_func:
-                            print(f"Found function '{name}' in {player_file}")
-                            break
-                    
-                    if play_func:
-                        # Create a wrapper that provides the player number
-                        def player_wrapper(player_view, player):
-                            # Tell the player which player they are
-                            print(f"Executing as Player {player_num}")
-                            # Try different parameter combinations
-                            try:
-                                sig = inspect.signature(play_func)
-                                param_count = len(sig.parameters)
-                                
-                                if param_count == 3:
-                                    return play_func(player_view, player, player_num)
-                                elif param_count == 2:
-                                    return play_func(player_view, player)
-                                else:
-                                    return play_func(player_view)
-                            except Exception as e:
-                                print(f"Error calling player function: {e}")
-                                return None
-                        
-                        return player_wrapper
-                    else:
-                        print(f"Error: No valid function found in {player_file}")
-                        print(f"Python players should define one of these functions: {possible_names}")
-                        print(f"Example: def play(player_view, player, player_num): ...")
-                        return None
-                except Exception as e:
-                    print(f"Error importing Python module: {e}")
-                    return None
-        
-        # For other languages, start a subprocess
-        if language.lower() == "java":
-            class_name = os.path.basename(player_file).split('.')[0]
-            cmd = ["java", "-cp", os.path.dirname(player_file), class_name, 
-                   str(self.port), player_id, str(player_num)]
-        elif language.lower() == "cpp":
-            executable = os.path.splitext(player_file)[0]
-            cmd = [executable, str(self.port), player_id, str(player_num)]
+            if not is_socket_player(language, player_file):
+                return self.load_python_strategy(player_file, player_num)
+            description = "socket-based Python"
         else:
+            description = language
+        
+        # Every player listens on a port of its own, so even a bot that never
+        # says hello is known by where it connects
+        listener = socket.create_server((self.host, 0))
+        cmd = player_command(language, player_file, listener.getsockname()[1], player_id, player_num)
+        if cmd is None:
             print(f"Unsupported language: {language}")
+            listener.close()
             return None
-            
+        
         try:
-            process = subprocess.Popen(cmd)
-            print(f"Started {language} player {player_num} with ID {player_id}")
+            process, server_end = self.spawn_player(cmd)
+        except Exception as e:
+            print(f"Error starting player process: {e}")
+            listener.close()
+            return None
+        print(f"Started {description} player {player_num} with ID {player_id}")
+        return PlayerLaunch(player_id, player_num, process, listener, server_end)
+    
+    def connect_players(self, launched, timeout=5):
+        """Wait for all launched players to connect at once; returns their strategies in order.
+        
+        PlayerLaunch entries become the player_id of their connection, or None
+        if the player did not connect within timeout. Anything else, like a
+        strategy function, is returned as it is.
+        """
+        strategies = list(launched)
+        waiting = {}  # Socket a launched player may connect on -> (position, launch)
+        for position, launch in enumerate(launched):
+            if isinstance(launch, PlayerLaunch):
+                strategies[position] = None
+                for sock in launch.sockets():
+                    waiting[sock] = (position, launch)
+        
+        deadline = time.time() + timeout
+        while waiting:
+            readable, _, _ = select.select(list(waiting), [], [], max(0, deadline - time.time()))
+            if not readable:
+                break
+            for ready in readable:
+                if ready not in waiting:
+                    continue  # The other socket of a player that connected in this round
+                position, launch = waiting[ready]
+                for sock in launch.sockets():
+                    del waiting[sock]
+                self.register_connection(launch.player_id, launch.accept(ready))
+                strategies[position] = launch.player_id
+        
+        for position, launch in set(waiting.values()):
+            print(f"Timeout waiting for player {launch.player_id} to connect")
+            launch.abandon()
+        return strategies
+    
+    def load_inprocess_player(self, player_file, player_num):
+        """Load the bot class of a socket player file as an InProcessPlayer, or return None."""
+        try:
+            bot_class = load_bot_class(player_file)
+            if bot_class is None:
+                print(f"Error: No class with a make_move method found in {player_file}")
+                return None
+            # Built the way the bot's main would, but it is never told to connect
+            bot = bot_class(None, f"inprocess-{player_num}", player_num)
+        except Exception as e:
+            print(f"Error loading in-process player from {player_file}: {e}")
+            return None
+        print(f"Running {bot_class.__name__} from {player_file} in process as player {player_num}")
+        return InProcessPlayer(bot, player_num, self.time_budget)
+    
+    def load_python_strategy(self, player_file, player_num):
+        """Import a Python player file and wrap its strategy function, or return None."""
+        try:
+            spec = importlib.util.spec_from_file_location("player_module", player_file)
+            if not spec:
+                print(f"Error: Could not load Python file {player_file}")
+                return None
+                
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
             
-            # Wait for the player to connect
-            self.server_socket.settimeout(5)
-            try:
-                client_socket, _ = self.server_socket.accept()
-                client_socket.settimeout(None)
-                self.connections[player_id] = client_socket
-                print(f"Player {player_id} connected")
-                return player_id
-            except socket.timeout:
-                print(f"Timeout waiting for player {player_id} to connect")
-                process.kill()
+            # Try multiple function name conventions
+            play_func = None
+            possible_names = ["play", f"player{player_num}", "make_move", "strategy"]
+            
+            for name in possible_names:
+                play_func = getattr(module, name, None)
+                if play_func:
+                    print(f"Found function '{name}' in {player_file}")
+                    break
+            
+            if play_func:
+                # Create a wrapper that provides the player number
+                def player_wrapper(state, player):
+                    # Try different parameter combinations
+                    try:
+                        sig = inspect.signature(play_func)
+                        param_count = len(sig.parameters)
+                        
+                        if param_count == 3:
+                            return play_func(state, player, player_num)
+                        elif param_count == 2:
+                            return play_func(state, player)
+                        else:
+                            return play_func(state)
+                    except Exception as e:
+                        print(f"Error calling player function: {e}")
+                        return None
+                
+                return player_wrapper
+            else:
+                print(f"Error: No valid function found in {player_file}")
+                print(f"Python players should define one of these functions: {possible_names}")
+                print(f"Example: def play(player_view, player, player_num): ...")
                 return None
         except Exception as e:
-            print(f"Error starting player process: {e}")
+            print(f"Error importing Python module: {e}")
             return None
     
-    def send_game_state(self, player_id, game_state):
-        """Send game state to a player process."""
-        if isinstance(player_id, str) and player_id in self.connections:
+    def spawn_player(self, cmd):
+        """Start a player process; returns (process, our end of its socketpair or None).
+        
+        With the socketpair transport the child inherits the other end, and
+        RTS_SOCKET_FD tells it the descriptor. Bots that don't look for it
+        simply connect over TCP as usual. Python players are forked from the
+        zygote pool when there is one.
+        """
+        warm = self.zygotes is not None and cmd[0] == "python"  # player_command runs python <file> <args>
+        if self.transport != "socketpair":
+            if warm:
+                return self.zygotes.spawn(cmd[1], cmd[2:]), None
+            return subprocess.Popen(cmd), None
+        server_end, child_end = socket.socketpair()
+        env = dict(os.environ, RTS_SOCKET_FD=str(child_end.fileno()))
+        try:
+            if warm:
+                process = self.zygotes.spawn(cmd[1], cmd[2:], child_end)
+            else:
+                process = subprocess.Popen(cmd, pass_fds=(child_end.fileno(),), env=env)
+        except Exception:
+            server_end.close()
+            raise
+        finally:
+            child_end.close()
+        return process, server_end
+    
+    def register_connection(self, player_id, client_socket):
+        """Adopt an accepted player connection."""
+        if client_socket.family in (socket.AF_INET, socket.AF_INET6):
+            # States and moves are small; don't let Nagle hold them back
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client_socket.settimeout(5.0)  # Bounds every blocking send and receive with this player
+        self.connections[player_id] = client_socket
+        self.readers[player_id] = FrameReader(client_socket)
+        self.encoders[player_id] = JsonEncoder()  # Until the client asks for something else
+        print(f"Player {player_id} connected")
+    
+    def drop_connection(self, player_id):
+        """Forget a player whose connection has closed."""
+        self.connections.pop(player_id, None)
+        self.readers.pop(player_id, None)
+        encoder = self.encoders.pop(player_id, None)
+        if encoder:
+            encoder.close()
+        self.pending_requests.pop(player_id, None)
+    
+    def send_game_state(self, player_id, player_view):
+        """Send a player's view of the game to a player process, in its protocol.
+        
+        False if the send failed or the player's connection is gone.
+        """
+        if isinstance(player_id, str):
+            if player_id not in self.connections:
+                return False  # Dropped; nothing can be sent or answered
             try:
                 client_socket = self.connections[player_id]
-                message = json.dumps(game_state) + "\n"
-                client_socket.sendall(message.encode())
+                message = self.encoders[player_id].encode(player_view)
+                client_socket.sendall(message)
                 # print(f"Sent {len(message)} bytes to player {player_id}")
                 return True
             except Exception as e:
@@ -1468,32 +2725,57 @@ class LanguageServer:
                 return False
         return True  # Return true for Python functions (no sending needed)
     
+    def handle_control(self, player_id, message) -> bool:
+        """Act on the protocol fields of a message; True if it was only a handshake.
+        
+        A client may open with {"hello": {"player_id": ..., "protocol": ...}}.
+        It is answered with {"welcome": {...}}, and every later state is sent
+        in the protocol named there. Clients that never say hello get JSON.
+        """
+        if not isinstance(message, dict):
+            return False
+        if "hello" in message:
+            hello = message["hello"] if isinstance(message["hello"], dict) else {}
+            if hello.get("player_id", player_id) != player_id:
+                # Identity comes from the port or socketpair it connected on; this is a confused bot
+                print(f"Player {player_id} introduced itself as {hello.get('player_id')}")
+            protocol = hello.get("protocol", "json")
+            if not isinstance(protocol, str) or protocol not in PROTOCOL_ENCODERS:
+                protocol = "json"
+            previous = self.encoders[player_id]
+            previous.close()
+            self.encoders[player_id] = PROTOCOL_ENCODERS[protocol]()
+            # Versions count states on the connection, so a reply to one sent before the switch still matches
+            self.encoders[player_id].version = previous.version
+            welcome = {"welcome": {"player_id": player_id, "protocol": protocol,
+                                   **self.encoders[player_id].welcome_info}}
+            self.connections[player_id].sendall((json.dumps(welcome) + "\n").encode())
+            return True
+        if "ack" in message:
+            self.encoders[player_id].ack(message["ack"])
+        return False
+    
     def receive_move(self, player_id):
         """Receive a move from a player process."""
         if isinstance(player_id, str) and player_id in self.connections:
+            response_str = None
             try:
-                client_socket = self.connections[player_id]
-                client_socket.settimeout(5.0)  # Set a timeout of 5 seconds
-                
-                data = b""
+                reader = self.readers[player_id]
                 while True:
-                    chunk = client_socket.recv(4096)
-                    if not chunk:
-                        break
-                    data += chunk
-                    if b"\n" in chunk:
+                    response_str = reader.read_frame()
+                    if not response_str:
                         break
-                
-                client_socket.settimeout(None)  # Reset timeout
-                
-                if data:
-                    response_str = data.decode().strip()
+                    move = json.loads(response_str)
+                    if self.handle_control(player_id, move):
+                        continue  # Handshake, not an answer
+                    if is_stale_reply(move, self.encoders[player_id]):
+                        continue  # Late answer to a state whose receive already timed out
                     # print(f"Received from player {player_id}: {response_str[:100]}...")
-                    return json.loads(response_str)
+                    return move
                 return None
             except json.JSONDecodeError as e:
                 print(f"JSON decode error from player {player_id}: {e}")
-                print(f"Received data: {data.decode() if data else 'None'}")
+                print(f"Received data: {response_str}")
                 return None
             except socket.timeout:
                 print(f"Timeout waiting for move from player {player_id}")
@@ -1503,6 +2785,77 @@ class LanguageServer:
                 return None
         return None
     
+    def request_move(self, player_id, player_view, deadline):
+        """Send a state without waiting; the reply is picked up by collect_moves if it beats deadline."""
+        if not self.send_game_state(player_id, player_view):
+            return False
+        self.pending_requests[player_id] = deadline
+        return True
+    
+    def collect_moves(self, wait_until=0):
+        """Return {player_id: move} for the replies that arrived in time.
+        
+        Waits until wait_until (a time.time() value) or until no request is
+        pending, whichever is first; the default only takes what is already
+        there. Requests past their deadline expire, and the late replies to
+        them are dropped when they arrive.
+        """
+        moves = {}
+        while True:
+            now = time.time()
+            for player_id, deadline in list(self.pending_requests.items()):
+                if player_id not in self.connections:
+                    del self.pending_requests[player_id]  # Dropped; no reply can come
+                elif now >= deadline:
+                    del self.pending_requests[player_id]
+            
+            if not self.pending_requests or any(reader.has_frame() for reader in self.readers.values()):
+                timeout = 0  # Nothing to wait for, or already buffered; only take what is there
+            else:
+                timeout = min([wait_until] + list(self.pending_requests.values())) - now
+            sockets = {reader.sock: player_id for player_id, reader in self.readers.items()}
+            try:
+                readable, _, _ = select.select(list(sockets), [], [], max(0, timeout))
+            except (OSError, ValueError):
+                readable = []
+            
+            for conn in readable:
+                player_id = sockets[conn]
+                try:
+                    received = self.readers[player_id].fill()
+                except OSError:
+                    received = 0
+                if not received:
+                    # Player disconnected; nothing more will come from it
+                    self.drop_connection(player_id)
+            
+            for player_id, reader in list(self.readers.items()):
+                for line in reader.frames():
+                    try:
+                        move = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        print(f"JSON decode error from player {player_id}: {e}")
+                        move = None
+                    try:
+                        if self.handle_control(player_id, move):
+                            continue  # Handshake, not an answer
+                    except OSError as e:
+                        print(f"Error sending to player {player_id}: {e}")
+                        self.drop_connection(player_id)
+                        break
+                    except Exception as e:
+                        # A malformed control message costs this player its message, not the game
+                        print(f"Error handling message from player {player_id}: {e}")
+                        continue
+                    if is_stale_reply(move, self.encoders[player_id]):
+                        continue  # Answer to a request that already timed out
+                    if self.pending_requests.pop(player_id, None) is None:
+                        continue  # Nothing was asked
+                    moves[player_id] = move
+            
+            if not self.pending_requests or time.time() >= wait_until:
+                return moves
+    
     def close(self):
         """Close all connections and the server."""
         for conn in self.connections.values():
@@ -1510,32 +2863,36 @@ class LanguageServer:
                 conn.close()
             except:
                 pass
-        self.server_socket.close()
-
-def execute_player_strategy(strategy_or_id, game_state, player, language_server=None):
+        for encoder in self.encoders.values():
+            encoder.close()
+
+def apply_player_move(player_view, move):
+    """Apply a {"move": ...} or {"moves": [...]} reply from an external player."""
+    if not isinstance(move, dict):
+        return  # Not a reply we understand; the player just loses the turn
+    if "moves" in move:
+        player_view.make_multi_move(move["moves"])
+    elif "move" in move:
+        m = move["move"]
+        if isinstance(m, list) and len(m) == 5:  # Make sure move has enough elements
+            player_view.make_move(m[0], m[1], m[2], m[3], m[4], None)
+        elif isinstance(m, list) and len(m) == 6:
+            player_view.make_move(m[0], m[1], m[2], m[3], m[4], m[5])
+
+def execute_player_strategy(strategy_or_id, game_state, player, language_server=None, snapshot=None):
     """Execute a player strategy, which can be a Python function or a player ID for external processes."""
     try:
-        player_view = PlayerViewState(game_state, player)
-        json_state = player_view.to_json()
+        player_view = PlayerViewState(game_state, player, snapshot)
         
         if callable(strategy_or_id):  
             # Handle Python strategy through JSON exchange
             try:
                 # Convert game state to JSON and pass it to the strategy
-                result = strategy_or_id(json_state, player.value)
-                print("NABAYAD IN ETTEFAGH BIOFTE!!")
+                result = strategy_or_id(player_view.to_json(), player.value)
                 
                 # Process the result as if it came from an external process
                 if isinstance(result, dict):
-                    if "moves" in result:
-                        player_view.make_multi_move(result["moves"])
-                    elif "move" in result and len(result["move"]) >= 5:
-                        if len(result["move"]) == 5:
-                            m = result["move"]
-                            player_view.make_move(m[0], m[1], m[2], m[3], m[4], None)
-                        elif len(result["move"]) == 6:
-                            m = result["move"]
-                            player_view.make_move(m[0], m[1], m[2], m[3], m[4], m[5])
+                    apply_player_move(player_view, result)
             except Exception as e:
                 print(f"Error executing Python strategy: {e}")
                 import traceback
@@ -1543,77 +2900,328 @@ def execute_player_strategy(strategy_or_id, game_state, player, language_server=
         
         elif language_server and isinstance(strategy_or_id, str):  # External process
             # Send game state to player
-            success = language_server.send_game_state(strategy_or_id, json_state)
+            success = language_server.send_game_state(strategy_or_id, player_view)
             if not success:
                 return
                 
             # Wait for player's move
-            move = language_server.receive_move(strategy_or_id)
-            if move and "moves" in move:
-                player_view.make_multi_move(move["moves"])
-            elif move and "move" in move:
-                m = move["move"]
-                if isinstance(m, list) and len(m) == 5:  # Make sure move has enough elements
-                    player_view.make_move(m[0], m[1], m[2], m[3], m[4], None)
-                elif isinstance(m, list) and len(m) == 6:
-                    player_view.make_move(m[0], m[1], m[2], m[3], m[4], m[5])
+            apply_player_move(player_view, language_server.receive_move(strategy_or_id))
     except Exception as e:
         print(f"Error in {player} strategy: {e}")
         import traceback
         traceback.print_exc()
 
-def run_game(player1_config=None, player2_config=None, size=8, max_duration=60):
+class AsyncPlayerConnection:
+    """A player's connection in an AsyncMatchServer; a background task reads its replies."""
+    def __init__(self, player_id, reader, writer, encoder):
+        self.player_id = player_id
+        self.reader = reader
+        self.writer = writer
+        self.encoder = encoder
+        self.replies = asyncio.Queue()
+        self.closed = False
+        self.read_task = asyncio.ensure_future(self.read_replies())
+    
+    async def read_replies(self):
+        while True:
+            try:
+                line = await self.reader.readline()
+            except (ConnectionError, ValueError):
+                line = b""
+            if not line:
+                self.closed = True
+                self.replies.put_nowait(None)  # Wake a request waiting on a closed connection
+                return
+            try:
+                message = json.loads(line)
+            except ValueError as e:  # Not JSON, or not even UTF-8
+                print(f"JSON decode error from player {self.player_id}: {e}")
+                message = None
+            if isinstance(message, dict):
+                if "hello" in message:
+                    continue  # Only meaningful as the first line, which the server already read
+                if "ack" in message:
+                    self.encoder.ack(message["ack"])
+            self.replies.put_nowait(message)
+    
+    async def request_move(self, player_view, timeout):
+        """Send a state and return the reply, or None if none came within timeout."""
+        if self.closed:
+            return None
+        while not self.replies.empty():
+            self.replies.get_nowait()  # Came in after their request timed out
+        try:
+            self.writer.write(self.encoder.encode(player_view))
+            await self.writer.drain()
+            return await asyncio.wait_for(self.next_reply(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Timeout waiting for move from player {self.player_id}")
+            return None
+        except ConnectionError as e:
+            print(f"Error sending to player {self.player_id}: {e}")
+            return None
+    
+    async def next_reply(self):
+        """The first reply that isn't to an older state; None once the connection has closed."""
+        while True:
+            message = await self.replies.get()
+            if not is_stale_reply(message, self.encoder):
+                return message
+    
+    def close(self):
+        self.read_task.cancel()
+        self.writer.close()
+        self.encoder.close()
+
+class AsyncMatchServer:
+    """Hosts many matches at once on one asyncio event loop and one listening port.
+    
+    Players say {"hello": {"player_id": ..., "protocol": ...}} right after
+    connecting and are routed to their match by player_id. A connection that
+    says nothing within hello_timeout (bots written before the handshake)
+    goes to the player being started, which is why players are started one
+    at a time; the matches themselves run concurrently. Matches run on a
+    VirtualClock, like run_game with a speed, and every decision waits at
+    most decision_timeout for a reply.
+    """
+    def __init__(self, host='localhost', port=0, decision_timeout=5.0, hello_timeout=0.2, zygotes=None):
+        self.host = host
+        self.port = port
+        self.decision_timeout = decision_timeout
+        self.hello_timeout = hello_timeout
+        self.zygotes = zygotes  # ZygotePool to fork Python players from, or None
+        self.server = None
+        self.waiting = {}  # player_id -> future for the connection of a started player
+        self.starting = None  # player_id of the player being started
+        self.start_lock = None
+    
+    async def start(self):
+        self.start_lock = asyncio.Lock()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Match server started on port {self.port}")
+    
+    def close(self):
+        if self.server:
+            self.server.close()
+    
+    async def handle_connection(self, reader, writer):
+        """Route a new connection to the player waiting for it."""
+        hello = None
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.hello_timeout)
+            message = json.loads(line) if line else None
+            if isinstance(message, dict) and isinstance(message.get("hello"), dict):
+                hello = message["hello"]
+        except asyncio.TimeoutError:
+            pass  # No handshake: a bot that waits for its first state
+        except (ValueError, ConnectionError) as e:
+            print(f"Unreadable hello from a new connection: {e}")
+        
+        player_id = hello.get("player_id") if hello else self.starting
+        future = self.waiting.pop(player_id, None) if isinstance(player_id, str) else None
+        if future is None or future.done():
+            print(f"Rejected connection for unknown player {player_id}")
+            writer.close()
+            return
+        
+        protocol = hello.get("protocol", "json") if hello else "json"
+        if not isinstance(protocol, str) or protocol not in PROTOCOL_ENCODERS:
+            protocol = "json"
+        encoder = PROTOCOL_ENCODERS[protocol]()
+        if hello:
+            welcome = {"welcome": {"player_id": player_id, "protocol": protocol, **encoder.welcome_info}}
+            writer.write((json.dumps(welcome) + "\n").encode())
+        future.set_result(AsyncPlayerConnection(player_id, reader, writer, encoder))
+    
+    async def start_player(self, language, player_file, player_num):
+        """Start a socket player and wait for it to connect; returns (connection, process)."""
+        if not is_socket_player(language, player_file):
+            print(f"Match server can't run {language} player {player_file}: only socket players are supported")
+            return None, None
+        async with self.start_lock:
+            player_id = str(uuid4())
+            cmd = player_command(language, player_file, self.port, player_id, player_num)
+            if cmd is None:
+                print(f"Unsupported language: {language}")
+                return None, None
+            
+            future = asyncio.get_running_loop().create_future()
+            self.waiting[player_id] = future
+            self.starting = player_id
+            process = None
+            try:
+                if self.zygotes is not None and language.lower() == "python":
+                    # Forking blocks on the zygote; keep the other matches running meanwhile
+                    process = await asyncio.get_running_loop().run_in_executor(
+                        None, self.zygotes.spawn, player_file, cmd[2:])
+                else:
+                    process = await asyncio.create_subprocess_exec(*cmd)
+                print(f"Started {language} player {player_num} with ID {player_id}")
+                connection = await asyncio.wait_for(future, 5)
+                print(f"Player {player_id} connected")
+                return connection, process
+            except (asyncio.TimeoutError, OSError) as e:
+                print(f"Error starting player {player_id}: {str(e) or 'timeout waiting to connect'}")
+                if process:
+                    await self.stop_process(process)
+                return None, None
+            finally:
+                self.waiting.pop(player_id, None)
+                self.starting = None
+    
+    async def stop_process(self, process):
+        """Kill a started player if it is still running."""
+        if isinstance(process, ZygoteChild):
+            # Asks its zygote, which may be busy forking for another match
+            await asyncio.get_running_loop().run_in_executor(None, process.kill)
+        elif process.returncode is None:
+            process.kill()
+            await process.wait()
+    
+    async def run_match(self, player1_config, player2_config, size=8, max_duration=60, speed=0):
+        """Play one match to the end and return the winner; speed as in run_game."""
+        state = GameState(size, max_duration, VirtualClock())
+        players = {}
+        processes = []
+        for player, config in ((Player.PLAYER1, player1_config), (Player.PLAYER2, player2_config)):
+            if config:
+                connection, process = await self.start_player(config[0], config[1], player.value)
+                if connection:
+                    players[player] = connection
+                    processes.append(process)
+        
+        decision_ticks = max(1, round(0.5 * FRAME_RATE))  # Same decision interval as run_game
+        tick = 0
+        try:
+            while True:
+                state.update()
+                winner = state.is_game_over()
+                if winner:
+                    announce_winner(winner, player1_config, player2_config)
+                    return winner
+                
+                if tick > 0 and tick % decision_ticks == 0:
+                    snapshot = state.snapshot()
+                    views = {player: PlayerViewState(state, player, snapshot) for player in players}
+                    replies = await asyncio.gather(*(connection.request_move(views[player], self.decision_timeout)
+                                                     for player, connection in players.items()))
+                    for player, move in zip(players, replies):
+                        try:
+                            apply_player_move(views[player], move)
+                        except Exception as e:
+                            print(f"Error applying move from {player}: {e}")  # Costs only their turn
+                
+                state.clock.tick()
+                tick += 1
+                if speed:
+                    await asyncio.sleep(state.clock.step / speed)
+                elif tick % FRAME_RATE == 0:
+                    await asyncio.sleep(0)  # Let the other matches run
+        finally:
+            for connection in players.values():
+                connection.close()
+            for process in processes:
+                await self.stop_process(process)
+
+def run_matches(matchups, size=8, max_duration=60, speed=0, decision_timeout=5.0, zygotes=None):
+    """Play every (player1_config, player2_config) matchup concurrently in this process.
+    
+    Returns the winners in the order of matchups, None for a match that
+    failed. With a ZygotePool, Python players are forked from already
+    imported copies of their bot. Only socket players can be matched this
+    way; any other config raises ValueError before a match starts.
+    """
+    for config in {config for matchup in matchups for config in matchup if config}:
+        if not is_socket_player(*config):
+            raise ValueError(f"{config[0]} player {config[1]} is not a socket player; "
+                             "concurrent matches only run socket_*.py, Java and C++ bots")
+    
+    async def play(server, player1_config, player2_config):
+        try:
+            return await server.run_match(player1_config, player2_config, size, max_duration, speed)
+        except Exception as e:
+            # The other matches share the event loop and keep going
+            print(f"Match {player1_config} vs {player2_config} failed: {e}")
+            return None
+    
+    async def play_all():
+        server = AsyncMatchServer(decision_timeout=decision_timeout, zygotes=zygotes)
+        await server.start()
+        try:
+            return await asyncio.gather(*(play(server, player1_config, player2_config)
+                                          for player1_config, player2_config in matchups))
+        finally:
+            server.close()
+    return asyncio.run(play_all())
+
+def run_game(player1_config=None, player2_config=None, size=8, max_duration=60, headless=False, speed=None,
+             decision_deadline=None, transport="tcp", zygotes=None):
     """
     Run the game with specified player configurations.
     
     player_config format: (language, file_path)
-    language can be 'python', 'java', or 'cpp'
-    """
-    pygame.init()
+    language can be 'python', 'java', 'cpp', or 'inprocess' to run the
+    GameClient class of a socket player file inside this process
     
-    window_width = size * (CELL_SIZE + MARGIN) + MARGIN
-    window_height = window_width + 60  # Adjusted for better UI space
+    With headless=True the match is simulated without importing or
+    initializing pygame: no window, no assets and no drawing.
     
-    screen = pygame.display.set_mode((window_width, window_height))
-    pygame.display.set_caption("Mushroom Wars - RTS")
+    speed=None runs on the wall clock. Any other value runs on a fixed-step
+    VirtualClock at that multiple of real time (0 means as fast as possible),
+    and each player gets a decision every ai_decision_interval of simulation
+    time; the simulation waits for both decisions instead of running on.
+    
+    With decision_deadline (seconds) set, socket players get their state
+    without a worker thread waiting on them: a reply is applied if it comes
+    back within the deadline and dropped otherwise. It is also the time
+    budget of in-process players.
+    
+    transport="socketpair" also hands every started player one end of a
+    socketpair (see LanguageServer.spawn_player); bots that don't use it
+    still connect over TCP.
+    """
+    if not headless:
+        init_pygame()
+        pygame.init()
+        
+        window_width = size * (CELL_SIZE + MARGIN) + MARGIN
+        window_height = window_width + 60  # Adjusted for better UI space
+        
+        screen = pygame.display.set_mode((window_width, window_height))
+        pygame.display.set_caption("Mushroom Wars - RTS")
+        
+        clock = pygame.time.Clock()
     
-    clock = pygame.time.Clock()
-    state = GameState(size, max_duration)
+    virtual_time = speed is not None
+    state = GameState(size, max_duration, VirtualClock() if virtual_time else None)
     
     # Add these properties to GameState for tracking player readiness
     state.p1_ready = True
     state.p2_ready = True
     
     # Start language server
-    language_server = LanguageServer()
+    language_server = LanguageServer(transport=transport, zygotes=zygotes, time_budget=decision_deadline)
     
-    # Load player strategies
-    player1_strategy = None
-    player2_strategy = None
+    # Load player strategies; both processes start at once and connect concurrently
+    launched = [language_server.launch_player(config[0], config[1], player_num) if config else None
+                for player_num, config in ((1, player1_config), (2, player2_config))]
+    player1_strategy, player2_strategy = language_server.connect_players(launched)
     
-    if player1_config:
-        language, file_path = player1_config
-        player1_strategy = language_server.start_player_process(language, file_path, 1)
-    
-    if player2_config:
-        language, file_path = player2_config
-        player2_strategy = language_server.start_player_process(language, file_path, 2)
-    
-    
-    # Load background image/texture
-    try:
-        grass_texture = pygame.image.load("asset/grass_texture.png")
-        grass_texture = pygame.transform.scale(grass_texture, (window_width, window_height))
-        use_background_image = True
-    except pygame.error as e:
-        print(f"Failed to load background image: {e}")
-        use_background_image = False
+    if not headless:
+        # Load background image/texture
+        try:
+            grass_texture = pygame.image.load("asset/grass_texture.png")
+            grass_texture = pygame.transform.scale(grass_texture, (window_width, window_height))
+            use_background_image = True
+        except pygame.error as e:
+            print(f"Failed to load background image: {e}")
+            use_background_image = False
 
     # Main game loop
     running = True
     game_over = False
     winner = None
-    font = load_font(16)
     
     # Track last AI decision time
     last_ai_move_time = {
@@ -1621,53 +3229,139 @@ def run_game(player1_config=None, player2_config=None, size=8, max_duration=60):
         Player.PLAYER2: time.time()
     }
     ai_decision_interval = 0.5  # AI makes decisions every second
+    decision_ticks = max(1, round(ai_decision_interval * FRAME_RATE))  # Decision budget in virtual time
+    
+    if virtual_time:
+        tick_interval = state.clock.step / speed if speed > 0 else 0
+    else:
+        tick_interval = 1.0 / FRAME_RATE
     
     executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    pending_decisions = {}  # Player -> future of their decision in progress
+    skipped_decisions = {Player.PLAYER1: 0, Player.PLAYER2: 0}  # Decision ticks lost to a slow strategy
+    
+    deadline_players = {}  # player_id -> Player for socket players collected by deadline
+    if decision_deadline is not None:
+        for strategy, player in ((player1_strategy, Player.PLAYER1), (player2_strategy, Player.PLAYER2)):
+            if isinstance(strategy, str):
+                deadline_players[strategy] = player
+    
+    def apply_collected_moves(wait_until=0):
+        for player_id, move in language_server.collect_moves(wait_until).items():
+            try:
+                apply_player_move(PlayerViewState(state, deadline_players[player_id]), move)
+            except Exception as e:
+                print(f"Error applying move from player {player_id}: {e}")  # Costs only their turn
+    
+    def submit_decision(strategy, player):
+        """Start a decision for player, unless their previous one is still running."""
+        if strategy in deadline_players:
+            if strategy in language_server.pending_requests:
+                skipped_decisions[player] += 1
+            else:
+                language_server.request_move(strategy, PlayerViewState(state, player, state.snapshot()),
+                                             time.time() + decision_deadline)
+            return None
+        pending = pending_decisions.get(player)
+        if pending is not None and not pending.done():
+            # Never queue a second request; it would only answer a stale state
+            skipped_decisions[player] += 1
+            return pending
+        # The snapshot is taken here, on the main loop, and shared by both players
+        pending_decisions[player] = executor.submit(execute_player_strategy, strategy, state, player, language_server,
+                                                    state.snapshot())
+        return pending_decisions[player]
+    
+    next_tick_time = time.time()
+    tick = 0
     
     while running:
         current_time = time.time()
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+        if not headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
             
         state.update()
         
         winner = state.is_game_over()
         if winner and not game_over:
             game_over = True
-            time_up = time.time() - state.start_time >= state.max_duration
-            show_game_over(screen, winner, time_up, player1_config, player2_config)
+            time_up = state.clock.now() - state.start_time >= state.max_duration
+            if headless:
+                announce_winner(winner, player1_config, player2_config)
+            else:
+                show_game_over(screen, winner, time_up, player1_config, player2_config)
             break
         
-        if not game_over:
+        if not game_over and virtual_time:
+            if tick > 0 and tick % decision_ticks == 0:
+                decisions = [submit_decision(player2_strategy, Player.PLAYER2)]
+                if player1_strategy:
+                    decisions.append(submit_decision(player1_strategy, Player.PLAYER1))
+                # Simulation time stands still until both players have answered
+                concurrent.futures.wait([decision for decision in decisions if decision])
+                if deadline_players:
+                    apply_collected_moves(time.time() + decision_deadline)
+        elif not game_over:
             if current_time - last_ai_move_time[Player.PLAYER2] >= ai_decision_interval:
-                executor.submit(execute_player_strategy, player2_strategy, state, Player.PLAYER2, language_server)
+                submit_decision(player2_strategy, Player.PLAYER2)
                 last_ai_move_time[Player.PLAYER2] = current_time
             
             if player1_strategy and current_time - last_ai_move_time[Player.PLAYER1] >= ai_decision_interval:
-                executor.submit(execute_player_strategy, player1_strategy, state, Player.PLAYER1, language_server)
+                submit_decision(player1_strategy, Player.PLAYER1)
                 last_ai_move_time[Player.PLAYER1] = current_time
+            
+            if deadline_players:
+                apply_collected_moves()
         
-        if use_background_image:
-            screen.blit(grass_texture, (0, 0))
-        else:
-            screen.fill(COLORS["background"])
+        state.clock.tick()
+        tick += 1
+        
+        if not headless:
+            if use_background_image:
+                screen.blit(grass_texture, (0, 0))
+            else:
+                screen.fill(COLORS["background"])
+            
+            draw_game(screen, state)
+            pygame.display.flip()
         
-        draw_game(screen, state)
-        pygame.display.flip()
-        clock.tick(60)  # 60 FPS
+        if headless or virtual_time:
+            # Pace the loop ourselves; speed 0 does not wait at all
+            next_tick_time += tick_interval
+            time.sleep(max(0, next_tick_time - time.time()))
+        else:
+            clock.tick(FRAME_RATE)
+    
+    for player, skipped in skipped_decisions.items():
+        if skipped:
+            print(f"{player} skipped {skipped} decision ticks waiting for its previous decision")
     
     # Clean up
     executor.shutdown(wait=False)
     language_server.close()
-    pygame.quit()
+    if not headless:
+        pygame.quit()
+    return winner
 
 if __name__ == "__main__":
+    if len(sys.argv) > 3 and sys.argv[1] == "--zygote":
+        # Started by BotZygote: --zygote <player_file> <control fd>
+        run_zygote(sys.argv[2], int(sys.argv[3]))
+        sys.exit()
+    
     player1_config = None
     player2_config = None
     size = 8
     max_duration = 60
+    headless = False
+    speed = None
+    decision_deadline = None
+    matches = 1
+    transport = "tcp"
+    warm = False
     
     i = 1
     while i < len(sys.argv):
@@ -1683,7 +3377,47 @@ if __name__ == "__main__":
         elif sys.argv[i] == "--duration" and i + 1 < len(sys.argv):
             max_duration = int(sys.argv[i+1])
             i += 2
+        elif sys.argv[i] == "--speed" and i + 1 < len(sys.argv):
+            # A multiple of real time, or "max" to run as fast as possible
+            speed = 0.0 if sys.argv[i+1] == "max" else float(sys.argv[i+1])
+            i += 2
+        elif sys.argv[i] == "--deadline" and i + 1 < len(sys.argv):
+            # Milliseconds a socket player has to answer before its move is dropped
+            decision_deadline = float(sys.argv[i+1]) / 1000
+            i += 2
+        elif sys.argv[i] == "--matches" and i + 1 < len(sys.argv):
+            # Play this many copies of the matchup at once on one match server
+            matches = int(sys.argv[i+1])
+            i += 2
+        elif sys.argv[i] == "--transport" and i + 1 < len(sys.argv):
+            transport = sys.argv[i+1]
+            i += 2
+        elif sys.argv[i] == "--warm":
+            # Fork Python players from a zygote that has already imported them
+            warm = True
+            i += 1
+        elif sys.argv[i] == "--headless":
+            headless = True
+            i += 1
         else:
             i += 1
     
-    run_game(player1_config, player2_config, size, max_duration)
+    zygotes = ZygotePool() if warm and hasattr(os, "fork") else None
+    try:
+        if matches > 1:
+            try:
+                winners = run_matches([(player1_config, player2_config)] * matches, size, max_duration, speed or 0,
+                                      decision_deadline or 5.0, zygotes)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            for player in PLAYERS:
+                print(f"{player}: {winners.count(player)} of {matches}")
+            if None in winners:
+                print(f"Failed: {winners.count(None)} of {matches}")
+        else:
+            run_game(player1_config, player2_config, size, max_duration, headless, speed, decision_deadline,
+                     transport, zygotes)
+    finally:
+        if zygotes:
+            zygotes.close()